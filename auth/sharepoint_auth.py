@@ -1,37 +1,54 @@
 """SharePoint authentication handler module."""
 
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from types import MappingProxyType
+from typing import Mapping, Optional
 import json
 import os
 import logging
 
+import anyio
 import msal
 import requests
 from config.settings import SHAREPOINT_CONFIG, TOKEN_CACHE_FILE
 
 # Set up logging
-logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 logger = logging.getLogger("sharepoint_auth")
 
+# Sleep used by keep_token_fresh; a module-level alias so tests can replace it
+# without patching asyncio for every coroutine in the loop
+_sleep = asyncio.sleep
+
 @dataclass
 class SharePointContext:
     """Context object for SharePoint connection."""
     access_token: str
     token_expiry: datetime
     graph_url: str = "https://graph.microsoft.com/v1.0"
+    # Headers built for the current token, reused until the token changes
+    _headers: Optional[Mapping[str, str]] = field(default=None, init=False, repr=False, compare=False)
+    _headers_token: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     @property
-    def headers(self) -> dict[str, str]:
-        """Get authorization headers for API calls."""
+    def headers(self) -> Mapping[str, str]:
+        """Get authorization headers for API calls.
+        
+        The mapping is shared and read-only; copy it before adding headers.
+        """
         # ヘッダーの内容をログに出力（トークンは一部のみ表示）
-        token_preview = f"{self.access_token[:10]}...{self.access_token[-10:]}" if self.access_token else "None"
-        logger.debug(f"Using token (preview): {token_preview}")
+        if logger.isEnabledFor(logging.DEBUG):
+            token_preview = f"{self.access_token[:10]}...{self.access_token[-10:]}" if self.access_token else "None"
+            logger.debug("Using token (preview): %s", token_preview)
         
-        return {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json",
-        }
+        if self._headers is None or self._headers_token != self.access_token:
+            self._headers = MappingProxyType({
+                "Authorization": f"Bearer {self.access_token}",
+                "Content-Type": "application/json",
+            })
+            self._headers_token = self.access_token
+        return self._headers
 
     def is_token_valid(self) -> bool:
         """Check if the access token is still valid."""
@@ -39,7 +56,7 @@ class SharePointContext:
         if not self.token_expiry:
             return False
         is_valid = datetime.now() < self.token_expiry
-        logger.debug(f"Token valid: {is_valid}, Expires: {self.token_expiry}")
+        logger.debug("Token valid: %s, Expires: %s", is_valid, self.token_expiry)
         return is_valid
 
     def test_connection(self) -> bool:
@@ -52,18 +69,18 @@ class SharePointContext:
             
             # Get site information via Microsoft Graph API
             site_url = f"{self.graph_url}/sites/{domain}:/sites/{site_name}"
-            logger.debug(f"Testing connection to: {site_url}")
+            logger.debug("Testing connection to: %s", site_url)
             
             response = requests.get(site_url, headers=self.headers)
             
             if response.status_code != 200:
-                logger.error(f"Connection test failed: HTTP {response.status_code} - {response.text}")
+                logger.error("Connection test failed: HTTP %s - %s", response.status_code, response.text)
                 return False
                 
-            logger.info(f"Connection test successful: {response.status_code}")
+            logger.info("Connection test successful: %s", response.status_code)
             return True
         except Exception as e:
-            logger.error(f"Error during connection test: {e}")
+            logger.error("Error during connection test: %s", e)
             return False
 
     def test_write_permissions(self) -> bool:
@@ -81,7 +98,7 @@ class SharePointContext:
             response = requests.get(site_url, headers=self.headers)
             
             if response.status_code != 200:
-                logger.error(f"Failed to get site ID: {response.status_code} - {response.text}")
+                logger.error("Failed to get site ID: %s - %s", response.status_code, response.text)
                 return False
             
             site_id = response.json().get("id")
@@ -95,7 +112,7 @@ class SharePointContext:
             response = requests.get(drives_url, headers=self.headers)
             
             if response.status_code != 200:
-                logger.error(f"Failed to get document libraries: {response.status_code} - {response.text}")
+                logger.error("Failed to get document libraries: %s - %s", response.status_code, response.text)
                 return False
                 
             drives = response.json().get("value", [])
@@ -117,12 +134,12 @@ class SharePointContext:
             response = requests.post(folder_url, headers=self.headers, json=folder_data)
             
             if response.status_code not in (200, 201):
-                logger.error(f"Failed to create test folder: {response.status_code} - {response.text}")
+                logger.error("Failed to create test folder: %s - %s", response.status_code, response.text)
                 if response.status_code == 401 or response.status_code == 403:
                     logger.error("Insufficient permissions for write operations")
                 return False
                 
-            logger.info(f"Write permission test successful: {response.status_code}")
+            logger.info("Write permission test successful: %s", response.status_code)
             
             # Try to delete the test folder
             folder_id = response.json().get("id")
@@ -130,14 +147,14 @@ class SharePointContext:
             
             delete_response = requests.delete(delete_url, headers=self.headers)
             if delete_response.status_code not in (200, 204):
-                logger.warning(f"Could not delete test folder: {delete_response.status_code}")
+                logger.warning("Could not delete test folder: %s", delete_response.status_code)
             else:
                 logger.info("Test folder deleted successfully")
                 
             return True
             
         except Exception as e:
-            logger.error(f"Error during write permission test: {e}")
+            logger.error("Error during write permission test: %s", e)
             return False
 
     def decode_and_log_token_permissions(self) -> None:
@@ -160,9 +177,9 @@ class SharePointContext:
             
             # Log token information
             logger.info("Token information:")
-            logger.info(f"Token expires: {claims.get('exp', 'unknown')}")
-            logger.info(f"Token issued: {claims.get('iat', 'unknown')}")
-            logger.info(f"Token issuer: {claims.get('iss', 'unknown')}")
+            logger.info("Token expires: %s", claims.get('exp', 'unknown'))
+            logger.info("Token issued: %s", claims.get('iat', 'unknown'))
+            logger.info("Token issuer: %s", claims.get('iss', 'unknown'))
             
             # Check for roles (app permissions) or scp (delegated permissions)
             roles = claims.get('roles', [])
@@ -171,25 +188,25 @@ class SharePointContext:
             if roles:
                 logger.info("Application permissions (roles):")
                 for role in roles:
-                    logger.info(f"  - {role}")
+                    logger.info("  - %s", role)
                 
                 # Check for write permissions
                 write_permissions = [p for p in roles if 'ReadWrite' in p or 'Manage' in p]
                 if write_permissions:
                     logger.info("Write permissions found:")
                     for p in write_permissions:
-                        logger.info(f"  - {p}")
+                        logger.info("  - %s", p)
                 else:
                     logger.warning("No write permissions found in token")
             
             if scp:
-                logger.info(f"Delegated permissions (scp): {scp}")
+                logger.info("Delegated permissions (scp): %s", scp)
                 
             if not roles and not scp:
                 logger.error("No roles or scp claims found in token - operations will likely fail")
                 
         except Exception as e:
-            logger.error(f"Error decoding token: {e}")
+            logger.error("Error decoding token: %s", e)
 
 
 def validate_config() -> None:
@@ -207,12 +224,16 @@ def validate_config() -> None:
     # Validate site URL format
     site_url = SHAREPOINT_CONFIG["site_url"]
     if not site_url.startswith("https://") or ".sharepoint.com/" not in site_url.lower():
-        logger.error(f"Invalid SharePoint site URL: {site_url}")
+        logger.error("Invalid SharePoint site URL: %s", site_url)
         raise ValueError(f"Invalid SharePoint site URL: {site_url}")
 
 
-async def get_auth_context() -> SharePointContext:
-    """Get SharePoint authentication context."""
+def _acquire_token() -> tuple[str, datetime]:
+    """Acquire an access token through MSAL (blocking).
+    
+    Returns:
+        The access token and its expiry time
+    """
     # Validate configuration first
     validate_config()
     
@@ -231,7 +252,7 @@ async def get_auth_context() -> SharePointContext:
             if accounts:
                 logger.info("Found refresh token in cache, attempting to use it")
         except Exception as e:
-            logger.warning(f"Error loading token cache: {e}")
+            logger.warning("Error loading token cache: %s", e)
     
     # Create MSAL client application
     app = msal.ConfidentialClientApplication(
@@ -257,7 +278,7 @@ async def get_auth_context() -> SharePointContext:
     if "access_token" not in result:
         error_code = result.get("error", "unknown")
         error_description = result.get("error_description", "Unknown error")
-        logger.error(f"Authentication failed: {error_code} - {error_description}")
+        logger.error("Authentication failed: %s - %s", error_code, error_description)
         
         # Log more detailed error information for troubleshooting
         if "AADSTS" in error_description:
@@ -274,7 +295,7 @@ async def get_auth_context() -> SharePointContext:
     
     # Log a preview of the token (for security, only partial token is shown)
     token_preview = f"{result['access_token'][:10]}...{result['access_token'][-10:]}"
-    logger.info(f"Token acquired successfully: {token_preview}")
+    logger.info("Token acquired successfully: %s", token_preview)
     
     # Save token cache
     try:
@@ -282,15 +303,21 @@ async def get_auth_context() -> SharePointContext:
             cache_file.write(cache.serialize())
         logger.info("Token cache saved to file")
     except Exception as e:
-        logger.warning(f"Error saving token cache: {e}")
+        logger.warning("Error saving token cache: %s", e)
     
     # Calculate token expiry (default is 1 hour)
     expiry = datetime.now() + timedelta(seconds=result.get("expires_in", 3600))
-    logger.info(f"Authentication successful, token expires at {expiry}")
+    logger.info("Authentication successful, token expires at %s", expiry)
+    return result["access_token"], expiry
+
+
+async def get_auth_context() -> SharePointContext:
+    """Get SharePoint authentication context."""
+    access_token, expiry = _acquire_token()
     
     # Return auth context
     context = SharePointContext(
-        access_token=result["access_token"],
+        access_token=access_token,
         token_expiry=expiry
     )
     
@@ -312,18 +339,51 @@ async def get_auth_context() -> SharePointContext:
     return context
 
 
+async def get_token_context() -> SharePointContext:
+    """Get a SharePoint authentication context without the startup diagnostics.
+    
+    Unlike get_auth_context, the token is acquired in a worker thread and no
+    connection or write-permission tests are run against the site.
+    """
+    access_token, expiry = await anyio.to_thread.run_sync(_acquire_token)
+    return SharePointContext(access_token=access_token, token_expiry=expiry)
+
+
 async def refresh_token_if_needed(context: SharePointContext) -> None:
     """Refresh token if needed."""
     if not context.is_token_valid():
         logger.info("Token expired, refreshing...")
         try:
-            # Re-authenticate to get a new token
-            new_context = await get_auth_context()
-            
-            # Update the context
-            context.access_token = new_context.access_token
-            context.token_expiry = new_context.token_expiry
+            # Re-authenticate off the event loop to get a new token
+            context.access_token, context.token_expiry = await anyio.to_thread.run_sync(_acquire_token)
             logger.info("Token refreshed successfully")
         except Exception as e:
-            logger.error(f"Error refreshing token: {e}")
-            raise
\ No newline at end of file
+            logger.error("Error refreshing token: %s", e)
+            raise
+
+
+async def keep_token_fresh(context: SharePointContext, margin: int = 60, retry_delay: int = 30) -> None:
+    """Refresh the token in place shortly before it expires, until cancelled.
+    
+    Only the token is renewed, in a worker thread; the startup connection and
+    permission checks of get_auth_context are not repeated.
+    
+    Args:
+        context: SharePoint context shared with request handlers
+        margin: Seconds before expiry at which to refresh
+        retry_delay: Seconds to wait before retrying a failed refresh
+    """
+    delay = (context.token_expiry - datetime.now()).total_seconds() - margin
+    while True:
+        await _sleep(max(delay, 0))
+        try:
+            access_token, expiry = await anyio.to_thread.run_sync(_acquire_token)
+        except Exception as e:
+            logger.error("Background token refresh failed: %s", e)
+            delay = retry_delay
+            continue
+        
+        context.access_token = access_token
+        context.token_expiry = expiry
+        logger.info("Token refreshed in background, expires at %s", context.token_expiry)
+        delay = (context.token_expiry - datetime.now()).total_seconds() - margin
@@ -31,10 +31,44 @@ SHAREPOINT_CONFIG = {
 # Microsoft Graph API settings
 GRAPH_API_VERSION = "v1.0"
 GRAPH_BASE_URL = f"https://graph.microsoft.com/{GRAPH_API_VERSION}"
+# Maximum number of concurrent Graph API requests per process
+GRAPH_MAX_CONCURRENCY = int(os.getenv("GRAPH_MAX_CONCURRENCY", "16"))
+# Pooled keep-alive connections per host; streamed downloads hold theirs outside the concurrency cap
+GRAPH_POOL_SIZE = int(os.getenv("GRAPH_POOL_SIZE", str(GRAPH_MAX_CONCURRENCY * 2)))
+# (connect, read) timeouts in seconds for Graph requests, so a hung connection
+# cannot hold a concurrency slot forever
+GRAPH_TIMEOUT = (
+    float(os.getenv("GRAPH_CONNECT_TIMEOUT", "5")),
+    float(os.getenv("GRAPH_READ_TIMEOUT", "60")),
+)
 
 # Token settings
 TOKEN_CACHE_FILE = ".token_cache"
 
+# REST server settings (python server.py)
+SERVER_CONFIG = {
+    "transport": os.getenv("SERVER_TRANSPORT", "both"),  # rest, jsonrpc (bare MCP app) or both
+    "host": os.getenv("HOST", "0.0.0.0"),
+    "port": int(os.getenv("PORT", "8080")),
+    # WEB_CONCURRENCY is the conventional variable set by PaaS hosts (Render, Heroku)
+    "workers": int(os.getenv("UVICORN_WORKERS") or os.getenv("WEB_CONCURRENCY") or (os.cpu_count() or 1) * 2 + 1),
+    "limit_concurrency": int(os.getenv("UVICORN_LIMIT_CONCURRENCY", "200")),  # Excess connections get 503
+    "backlog": int(os.getenv("UVICORN_BACKLOG", "2048")),
+    "timeout_keep_alive": int(os.getenv("UVICORN_KEEPALIVE", "5")),
+    "thread_pool_size": int(os.getenv("ANYIO_THREADS", "64")),  # Worker threads for blocking calls
+    "http2": os.getenv("HTTP2", "False").lower() in ("true", "1", "t"),  # Serve with Hypercorn
+}
+
+# Cache settings for the REST wrappers
+CACHE_CONFIG = {
+    "list_files_ttl": float(os.getenv("LIST_FILES_TTL", "30")),  # Seconds; 0 disables the cache
+    "file_content_ttl": float(os.getenv("FILE_CONTENT_TTL", "30")),  # Seconds; 0 disables the cache
+    "file_content_max_entries": int(os.getenv("FILE_CONTENT_CACHE_SIZE", "64")),
+    # Where each requested file name was found (site, library and item IDs)
+    "file_lookup_ttl": float(os.getenv("FILE_LOOKUP_TTL", "300")),  # Seconds; 0 disables the cache
+    "file_lookup_max_entries": int(os.getenv("FILE_LOOKUP_CACHE_SIZE", "1024")),
+}
+
 # Document processing settings
 DOCUMENT_PROCESSING = {
     "max_text_preview_length": 5000,  # Maximum characters for text preview
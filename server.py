@@ -1,103 +1,387 @@
 # server.py
 """SharePoint MCP REST wrapper for list_files and get_file_content."""
 
-import os
 import sys
+import asyncio
+import hashlib
+import mimetypes
 import logging
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress, AsyncExitStack
 from datetime import datetime, timedelta
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any, Literal, Optional
+from urllib.parse import quote
 
+import anyio
+import orjson
+import requests
 from fastmcp import FastMCP
-from fastapi import FastAPI, HTTPException
-import uvicorn, httpx
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.applications import Starlette
+from starlette.datastructures import QueryParams
+import uvicorn
 
-from auth.sharepoint_auth import SharePointContext, get_auth_context
-from config.settings import APP_NAME, DEBUG
+from auth.sharepoint_auth import SharePointContext, get_token_context, keep_token_fresh
+from config.settings import APP_NAME, DEBUG, GRAPH_BASE_URL, SHAREPOINT_CONFIG, SERVER_CONFIG, CACHE_CONFIG
+from tools.site_tools import FILE_FIELDS, AmbiguousFileError, register_site_tools, list_site_files, read_site_file, stream_site_file
+from utils.cache import SingleFlight, TTLCache
+from utils.graph_client import close_session
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Logging
 # ────────────────────────────────────────────────────────────────────────────────
-logging.basicConfig(
-    level=logging.DEBUG if DEBUG else logging.INFO,
-    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
-)
+# No timestamps: the process supervisor / uvicorn already stamps each line
+_LOG_FORMAT = "%(levelname)s %(name)s: %(message)s"
+logging.basicConfig(level=logging.DEBUG if DEBUG else logging.INFO, format=_LOG_FORMAT)
+
 logger = logging.getLogger("sharepoint_mcp")
+logger.propagate = False
+if not logger.handlers:
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter(_LOG_FORMAT))
+    logger.addHandler(_log_handler)
+
+# Context handed out when authentication fails at startup
+_ERROR_ACCESS_TOKEN = "error"
+_ERROR_TOKEN_TTL = timedelta(seconds=10)
 
 @asynccontextmanager
-async def sharepoint_lifespan(server: FastMCP) -> AsyncIterator[SharePointContext]:
+async def _authenticated_context(
+    authenticate: Callable[[], Awaitable[SharePointContext]],
+) -> AsyncIterator[SharePointContext]:
+    """Authenticate, then keep the context's token fresh until exit.
+    
+    Args:
+        authenticate: Coroutine function returning a new SharePoint context
+    """
     logger.info("Initializing SharePoint connection…")
     try:
-        ctx = await get_auth_context()
+        ctx = await authenticate()
         logger.info("Authenticated. Token expires at %s", ctx.token_expiry)
-        yield ctx
     except Exception as e:
         logger.error("Authentication error: %s", e)
-        yield SharePointContext(
-            access_token="error",
-            token_expiry=datetime.now() + timedelta(seconds=10),
-            graph_url="https://graph.microsoft.com/v1.0",
+        # Placeholder that expires quickly so the background refresher retries soon
+        ctx = SharePointContext(
+            access_token=_ERROR_ACCESS_TOKEN,
+            token_expiry=datetime.now() + _ERROR_TOKEN_TTL,
+            graph_url=GRAPH_BASE_URL,
         )
+    # Renew the token ahead of expiry so requests never wait on re-authentication
+    refresh_task = asyncio.create_task(keep_token_fresh(ctx))
+    try:
+        yield ctx
     finally:
+        refresh_task.cancel()
+        # Wait for the refresher to finish so no task is left pending at shutdown
+        with suppress(asyncio.CancelledError):
+            await refresh_task
         logger.info("Tearing down SharePoint connection…")
 
+# Authenticated context owned by the running app (see _app_context), shared
+# with the MCP lifespan so each worker authenticates once
+_shared_ctx: Optional[SharePointContext] = None
+
+@asynccontextmanager
+async def _app_context() -> AsyncIterator[SharePointContext]:
+    """Authenticate once for the app's lifetime and share the context with MCP.
+    
+    Only the token is acquired: every worker runs this at startup, so the
+    connection and write-permission probes of get_auth_context are left to
+    the diagnostic scripts.
+    """
+    global _shared_ctx
+    async with _authenticated_context(get_token_context) as ctx:
+        _shared_ctx = ctx
+        try:
+            yield ctx
+        finally:
+            _shared_ctx = None
+
+@asynccontextmanager
+async def sharepoint_lifespan(server: FastMCP) -> AsyncIterator[SharePointContext]:
+    # Served by create_app: reuse the app's context
+    if _shared_ctx is not None:
+        yield _shared_ctx
+        return
+    # Run standalone (e.g. mcp dev): authenticate for this server alone
+    async with _authenticated_context(get_token_context) as ctx:
+        yield ctx
+
 mcp = FastMCP(APP_NAME, lifespan=sharepoint_lifespan)
-from tools.site_tools import register_site_tools  # noqa: E402
 register_site_tools(mcp)
 
 # ────────────────────────────────────────────────────────────────────────────────
-# Build REST API
+# REST wrappers
+# ────────────────────────────────────────────────────────────────────────────────
+rest_router = APIRouter()
+
+# Graph calls are slow and throttled, so repeated polls are answered from
+# short-lived per-process caches of the encoded body and its ETag
+_list_files_cache = TTLCache(ttl=CACHE_CONFIG["list_files_ttl"])
+_file_content_cache = TTLCache(
+    ttl=CACHE_CONFIG["file_content_ttl"], maxsize=CACHE_CONFIG["file_content_max_entries"]
+)
+
+# Concurrent cache misses for the same key share one Graph call
+_inflight = SingleFlight()
+
+def _encode_json(content: Any) -> tuple[bytes, str]:
+    """Serialize content as JSON and compute its ETag, once per cache entry.
+    
+    The ETag is weak because the gzip middleware may re-encode the body.
+    """
+    body = orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return body, f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+def _etag_response(request: Request, encoded: tuple[bytes, str]) -> Response:
+    """Send a body encoded by _encode_json, answering 304 if the client has it."""
+    body, etag = encoded
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in (t.strip() for t in if_none_match.split(","))):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+# The REST wrappers call the tool implementations in-process rather than
+# round-tripping through the MCP JSON-RPC endpoint.
+@rest_router.get("/list_files", summary="List all files in the site's document libraries")
+async def list_files(request: Request, concurrency: int = Query(8, ge=1, le=64),
+                     fields: Optional[str] = Query(None, description="Comma-separated file fields to return")):
+    selected = None
+    if fields is not None:
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        if not requested:
+            raise HTTPException(status_code=400, detail="No fields requested")
+        unknown = requested - set(FILE_FIELDS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        # Same order for any spelling of the same selection, so they share a cache entry
+        selected = tuple(key for key in FILE_FIELDS if key in requested)
+    
+    cache_key = ("list_files", SHAREPOINT_CONFIG["site_url"], selected)
+    encoded = _list_files_cache.get(cache_key)
+    if encoded is not None:
+        return _etag_response(request, encoded)
+    
+    async def load_files():
+        encoded = _encode_json(await list_site_files(request.app.state.sp_ctx, concurrency, selected))
+        _list_files_cache.set(cache_key, encoded)
+        return encoded
+    
+    return _etag_response(request, await _inflight.do(cache_key, load_files))
+
+@rest_router.get("/get_file_content", summary="Get the raw content of a file")
+async def get_file_content(request: Request, filename: str, stream: bool = False):
+    if stream:
+        # Pipe the raw bytes through instead of buffering and JSON-encoding them
+        chunks = await stream_site_file(request.app.state.sp_ctx, filename)
+        # filename may be a path from the library root; name the download after the file
+        basename = filename.rstrip("/").rsplit("/", 1)[-1]
+        return StreamingResponse(
+            chunks,
+            media_type=mimetypes.guess_type(basename)[0] or "application/octet-stream",
+            headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(basename)}"},
+        )
+    
+    cache_key = ("get_file_content", filename)
+    encoded = _file_content_cache.get(cache_key)
+    if encoded is not None:
+        return _etag_response(request, encoded)
+    
+    async def load_content():
+        encoded = _encode_json(await read_site_file(request.app.state.sp_ctx, filename))
+        _file_content_cache.set(cache_key, encoded)
+        return encoded
+    
+    return _etag_response(request, await _inflight.do(cache_key, load_content))
+
+# Errors are mapped to responses once here instead of in every route
+async def _not_found_handler(request: Request, exc: FileNotFoundError) -> JSONResponse:
+    return JSONResponse({"detail": str(exc)}, status_code=404)
+
+async def _ambiguous_file_handler(request: Request, exc: AmbiguousFileError) -> JSONResponse:
+    return JSONResponse({"detail": str(exc)}, status_code=409)
+
+async def _upstream_error_handler(request: Request, exc: requests.RequestException) -> JSONResponse:
+    logger.error("%s %s upstream error: %s", request.method, request.url.path, exc)
+    return JSONResponse({"detail": str(exc)}, status_code=502)
+
+async def _unhandled_error_handler(request: Request, exc: Exception) -> JSONResponse:
+    logger.error("%s %s failed: %s", request.method, request.url.path, exc)
+    return JSONResponse({"detail": str(exc)}, status_code=500)
+
+# ────────────────────────────────────────────────────────────────────────────────
+# App factory
 # ────────────────────────────────────────────────────────────────────────────────
-app = FastAPI(title="SharePoint MCP REST")
+Transport = Literal["rest", "jsonrpc", "both"]
+
+# Values FastAPI accepts as true for a bool query parameter
+_TRUE_VALUES = {"1", "true", "t", "on", "yes", "y"}
+
+def _is_file_download(scope) -> bool:
+    """Whether the request is a raw /get_file_content?stream=true download."""
+    if scope["path"] != "/get_file_content":
+        return False
+    return QueryParams(scope["query_string"]).get("stream", "").lower() in _TRUE_VALUES
+
+class RestGZipMiddleware(GZipMiddleware):
+    """Gzip the REST JSON responses only.
+    
+    The mounted MCP app is passed through untouched, since gzip buffers output
+    and would hold back its streamed (SSE) events. Raw file downloads are too:
+    PDF and Office files are already compressed, so gzip only burns CPU.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and (scope["path"].startswith("/mcp/") or _is_file_download(scope)):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
 
-@app.get("/", summary="Health check")
-async def root():
+async def root(request: Request) -> JSONResponse:
     """Health check endpoint."""
-    return {"status": "ok", "message": "SharePoint MCP server is running."}
-
-# Mount the core JSON-RPC at /mcp/ (note trailing slash)
-starlette_app = mcp.http_app()
-# Log all available routes for debugging
-for route in getattr(starlette_app, "routes", []):
-    logger.error("MCP CORE ROUTE: %s   PATH: %s", getattr(route, "name", "-"), getattr(route, "path", getattr(route, "path_regex", "-")))
-app.mount("/mcp/", starlette_app)
-
-# Figure out internal RPC URL (with trailing slash to avoid redirect)
-_RPC_PORT = os.getenv("PORT", "8080")
-RPC_URL = f"http://127.0.0.1:{_RPC_PORT}/mcp/"
-logger.error("REST wrapper will POST to %s", RPC_URL)
-
-async def _rpc_call(method: str, params: dict):
-    """Call the internal JSON-RPC endpoint and return .result or raise."""
-    payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
-    async with httpx.AsyncClient(follow_redirects=True) as client:
-        resp = await client.post(RPC_URL, json=payload)
-        resp.raise_for_status()
-        data = resp.json()
-    if "error" in data:
-        err = data["error"]
-        raise HTTPException(status_code=500, detail=f"{err.get('code')}: {err.get('message')}")
-    return data.get("result")
-
-@app.get("/list_files", summary="List all files in SharePoint")
-async def list_files():
+    return JSONResponse({"status": "ok", "message": "SharePoint MCP server is running."})
+
+def _configure_thread_pool() -> None:
+    """Size the threads shared by Graph requests and Starlette's run_in_threadpool (anyio defaults to 40)."""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = SERVER_CONFIG["thread_pool_size"]
+
+def create_app(*, transport: Transport = "both") -> Starlette:
+    """Build the ASGI app.
+    
+    Args:
+        transport: "rest" for the REST wrappers only, "jsonrpc" for the MCP
+            endpoint only, or "both" (MCP mounted at /mcp/)
+    """
+    if transport not in ("rest", "jsonrpc", "both"):
+        raise ValueError(f"Unknown transport: {transport}")
+    
+    if transport == "jsonrpc":
+        # Nothing else to serve, so hand out the MCP app itself rather than
+        # paying for a FastAPI router lookup and mount hop on every request
+        mcp_app = mcp.http_app()
+        mcp_lifespan = mcp_app.router.lifespan_context
+        
+        @asynccontextmanager
+        async def jsonrpc_lifespan(app: Starlette) -> AsyncIterator[None]:
+            _configure_thread_pool()
+            try:
+                async with _app_context(), mcp_lifespan(app):
+                    yield
+            finally:
+                close_session()
+        
+        mcp_app.router.lifespan_context = jsonrpc_lifespan
+        mcp_app.add_route("/", root, methods=["GET"])
+        return mcp_app
+    
+    mcp_app = mcp.http_app() if transport == "both" else None
+    
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        _configure_thread_pool()
+        async with AsyncExitStack() as stack:
+            # Release pooled Graph connections on shutdown
+            stack.callback(close_session)
+            # Entered before the MCP lifespan so MCP reuses this context
+            app.state.sp_ctx = await stack.enter_async_context(_app_context())
+            # The mounted MCP app needs its own lifespan to serve sessions
+            if mcp_app is not None:
+                await stack.enter_async_context(mcp_app.lifespan(app))
+            yield
+    
+    app = FastAPI(title="SharePoint MCP REST", lifespan=lifespan)
+    # File listings are repetitive JSON and compress several times over
+    app.add_middleware(RestGZipMiddleware, minimum_size=1024, compresslevel=5)
+    app.add_api_route("/", root, summary="Health check")
+    app.include_router(rest_router)
+    app.add_exception_handler(FileNotFoundError, _not_found_handler)
+    app.add_exception_handler(AmbiguousFileError, _ambiguous_file_handler)
+    app.add_exception_handler(requests.RequestException, _upstream_error_handler)
+    app.add_exception_handler(Exception, _unhandled_error_handler)
+    
+    if mcp_app is not None:
+        if DEBUG:
+            logger.debug("MCP routes: %s", [getattr(route, "path", None) for route in getattr(mcp_app, "routes", [])])
+        # Mount the core JSON-RPC at /mcp/ (note trailing slash)
+        app.mount("/mcp/", mcp_app)
+    
+    return app
+
+app = create_app(transport=SERVER_CONFIG["transport"])
+
+def _event_loop() -> str:
+    """Prefer uvloop's libuv-based event loop, falling back to asyncio."""
     try:
-        return await _rpc_call("list_files", {})
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error("list_files wrapper error: %s", e)
-        raise HTTPException(status_code=500, detail=str(e))
+        import uvloop  # noqa: F401
+    except ImportError:
+        return "asyncio"
+    return "uvloop"
 
-@app.get("/get_file_content", summary="Get the raw content of a file")
-async def get_file_content(filename: str):
+def _http_protocol() -> str:
+    """Prefer the httptools C parser, falling back to h11."""
     try:
-        return await _rpc_call("get_file_content", {"filename": filename})
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error("get_file_content wrapper error: %s", e)
-        raise HTTPException(status_code=500, detail=str(e))
+        import httptools  # noqa: F401
+    except ImportError:
+        return "h11"
+    return "httptools"
+
+def _serve_http2() -> bool:
+    """Serve the app with Hypercorn so clients can multiplex requests over HTTP/2.
+    
+    Returns False if Hypercorn is not installed. Hypercorn is run as a single
+    process without the Uvicorn worker and concurrency limits; use its CLI
+    (hypercorn --workers N server:app) to scale out. No certificate is set, so
+    clients must speak cleartext HTTP/2 (h2c) with prior knowledge; browsers
+    only use HTTP/2 over TLS.
+    """
+    try:
+        from hypercorn.asyncio import serve
+        from hypercorn.config import Config
+    except ImportError:
+        logger.warning("HTTP2 is enabled but hypercorn is not installed; falling back to Uvicorn")
+        logger.warning("Please install with: pip install hypercorn")
+        return False
+    
+    if SERVER_CONFIG["workers"] > 1:
+        logger.warning(
+            "HTTP2 serves a single process: ignoring %s workers and limit_concurrency=%s",
+            SERVER_CONFIG["workers"], SERVER_CONFIG["limit_concurrency"],
+        )
+        logger.warning("To scale out, run: hypercorn --workers %s server:app", SERVER_CONFIG["workers"])
+    
+    config = Config()
+    config.bind = [f"{SERVER_CONFIG['host']}:{SERVER_CONFIG['port']}"]
+    config.backlog = SERVER_CONFIG["backlog"]
+    config.keep_alive_timeout = SERVER_CONFIG["timeout_keep_alive"]
+    
+    if _event_loop() == "uvloop":
+        import uvloop
+        uvloop.run(serve(app, config))
+    else:
+        asyncio.run(serve(app, config))
+    return True
+
+def main():
+    """Run the REST wrapper under Uvicorn, or Hypercorn when HTTP/2 is enabled."""
+    if SERVER_CONFIG["http2"] and _serve_http2():
+        return
+    
+    # Workers are separate processes, so the app must be passed as an import string
+    uvicorn.run(
+        "server:app",
+        host=SERVER_CONFIG["host"],
+        port=SERVER_CONFIG["port"],
+        workers=SERVER_CONFIG["workers"],
+        loop=_event_loop(),
+        http=_http_protocol(),
+        # Shed excess load with 503s instead of queueing it behind slow Graph calls
+        limit_concurrency=SERVER_CONFIG["limit_concurrency"],
+        backlog=SERVER_CONFIG["backlog"],
+        timeout_keep_alive=SERVER_CONFIG["timeout_keep_alive"],
+        log_level="info",
+    )
 
 if __name__ == "__main__":
-    uvicorn.run("server:app", host="0.0.0.0", port=int(_RPC_PORT), reload=True)
+    main()
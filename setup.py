@@ -25,6 +25,14 @@ setup(
         "requests>=2.28.0",
         "pandas>=1.5.0",
         "python-dotenv>=0.21.0",
+        # REST server started by the sharepoint-mcp console script
+        "fastmcp>=2.1.0",
+        "fastapi>=0.110",
+        "uvicorn[standard]>=0.27",
+        "uvloop>=0.19; sys_platform != 'win32'",
+        "httptools>=0.6",
+        "orjson>=3.9",
+        "anyio>=4.0",
     ],
     extras_require={
         "dev": [
@@ -32,6 +40,9 @@ setup(
             "black>=22.3.0",
             "ruff>=0.0.169",
         ],
+        "http2": [
+            "hypercorn>=0.16",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -1,9 +1,10 @@
 import os
+import asyncio
 import pytest
 from unittest.mock import patch, MagicMock
 from datetime import datetime, timedelta
 
-from auth.sharepoint_auth import SharePointContext
+from auth.sharepoint_auth import SharePointContext, get_token_context, keep_token_fresh
 
 def test_sharepoint_context_headers():
     """Test that headers are correctly generated from context."""
@@ -15,6 +16,11 @@ def test_sharepoint_context_headers():
     headers = context.headers
     assert headers["Authorization"] == "Bearer test_token"
     assert headers["Content-Type"] == "application/json"
+    
+    # Headers are reused until the token changes
+    assert context.headers is headers
+    context.access_token = "new_token"
+    assert context.headers["Authorization"] == "Bearer new_token"
 
 def test_token_expiry():
     """Test token expiry checking."""
@@ -62,4 +68,41 @@ def test_test_connection(mock_get):
     mock_get.return_value = mock_response
     
     with patch.dict('os.environ', {'SITE_URL': 'https://contoso.sharepoint.com/sites/test'}):
-        assert context.test_connection() == False
\ No newline at end of file
+        assert context.test_connection() == False
+
+def test_keep_token_fresh():
+    """Test that the background refresher updates the shared context before expiry."""
+    context = SharePointContext(
+        access_token="old_token",
+        token_expiry=datetime.now() + timedelta(seconds=30)
+    )
+    new_expiry = datetime.now() + timedelta(hours=1)
+    
+    sleeps = []
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+        if len(sleeps) > 1:
+            raise asyncio.CancelledError
+    
+    with patch('auth.sharepoint_auth._acquire_token', MagicMock(return_value=("new_token", new_expiry))), \
+            patch('auth.sharepoint_auth._sleep', fake_sleep):
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(keep_token_fresh(context))
+    
+    assert context.access_token == "new_token"
+    assert context.token_expiry == new_expiry
+    # Already inside the refresh margin, so the first refresh happens immediately
+    assert sleeps[0] == 0
+    # The next refresh is scheduled about a minute before the new expiry
+    assert 3500 < sleeps[1] < 3600
+
+def test_get_token_context_skips_diagnostics():
+    """Test that the token-only context is built without probing the site."""
+    expiry = datetime.now() + timedelta(hours=1)
+    with patch('auth.sharepoint_auth._acquire_token', MagicMock(return_value=("token", expiry))), \
+            patch.object(SharePointContext, 'test_write_permissions') as mock_write_test:
+        context = asyncio.run(get_token_context())
+    
+    assert context.access_token == "token"
+    assert context.token_expiry == expiry
+    mock_write_test.assert_not_called()
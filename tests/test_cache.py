@@ -0,0 +1,65 @@
+import asyncio
+from unittest.mock import patch
+
+from utils.cache import SingleFlight, TTLCache
+
+def test_ttl_cache_expiry():
+    """Test that entries are served until their TTL elapses."""
+    cache = TTLCache(ttl=30)
+    
+    with patch('utils.cache.time.monotonic', return_value=100.0):
+        cache.set("key", ["value"])
+        assert cache.get("key") == ["value"]
+    
+    with patch('utils.cache.time.monotonic', return_value=129.0):
+        assert cache.get("key") == ["value"]
+    
+    with patch('utils.cache.time.monotonic', return_value=130.0):
+        assert cache.get("key") is None
+    assert len(cache) == 0
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test that the cache stays within maxsize."""
+    cache = TTLCache(ttl=30, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    
+    # Touch "a" so that "b" becomes the eviction candidate
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+def test_ttl_cache_disabled():
+    """Test that a non-positive TTL disables caching."""
+    cache = TTLCache(ttl=0)
+    cache.set("key", "value")
+    assert cache.get("key") is None
+
+def test_ttl_cache_delete():
+    """Test that entries can be removed, and that removing a missing key is a no-op."""
+    cache = TTLCache(ttl=30)
+    cache.set("key", "value")
+    cache.delete("key")
+    cache.delete("missing")
+    assert cache.get("key") is None
+
+def test_single_flight_coalesces_concurrent_calls():
+    """Test that concurrent calls for one key share a single execution."""
+    calls = []
+    
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "content"
+    
+    async def run():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("report.docx", fetch) for _ in range(5)))
+        assert len(flight) == 0
+        return results
+    
+    assert asyncio.run(run()) == ["content"] * 5
+    assert len(calls) == 1
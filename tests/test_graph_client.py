@@ -1,9 +1,11 @@
+import asyncio
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from datetime import datetime, timedelta
 
 from auth.sharepoint_auth import SharePointContext
-from utils.graph_client import GraphClient
+from config.settings import GRAPH_TIMEOUT
+from utils.graph_client import GraphClient, close_session
 
 @pytest.fixture
 def mock_context():
@@ -18,7 +20,16 @@ def graph_client(mock_context):
     """Create a GraphClient instance with mock context."""
     return GraphClient(mock_context)
 
-@patch('requests.get')
+def test_clients_share_session(mock_context):
+    """Test that Graph clients reuse one pooled session until it is closed."""
+    first = GraphClient(mock_context)
+    second = GraphClient(mock_context)
+    assert first.session is second.session
+    
+    close_session()
+    assert GraphClient(mock_context).session is not first.session
+
+@patch('requests.Session.get')
 async def test_get(mock_get, graph_client):
     """Test the GET method of GraphClient."""
     # Setup mock response
@@ -32,7 +43,8 @@ async def test_get(mock_get, graph_client):
     assert result == {"value": "test_data"}
     mock_get.assert_called_once_with(
         "https://graph.microsoft.com/v1.0/endpoint/test",
-        headers=graph_client.context.headers
+        headers=graph_client.context.headers,
+        timeout=GRAPH_TIMEOUT
     )
     
     # Test error response
@@ -44,7 +56,7 @@ async def test_get(mock_get, graph_client):
         await graph_client.get("endpoint/error")
     assert "Graph API error: 404" in str(excinfo.value)
 
-@patch('requests.post')
+@patch('requests.Session.post')
 async def test_post(mock_post, graph_client):
     """Test the POST method of GraphClient."""
     # Setup mock response
@@ -62,7 +74,8 @@ async def test_post(mock_post, graph_client):
     mock_post.assert_called_once_with(
         "https://graph.microsoft.com/v1.0/endpoint/create",
         headers=graph_client.context.headers,
-        json=test_data
+        json=test_data,
+        timeout=GRAPH_TIMEOUT
     )
     
     # Test error response
@@ -72,4 +85,45 @@ async def test_post(mock_post, graph_client):
     
     with pytest.raises(Exception) as excinfo:
         await graph_client.post("endpoint/error", test_data)
-    assert "Graph API error: 400" in str(excinfo.value)
\ No newline at end of file
+    assert "Graph API error: 400" in str(excinfo.value)
+def test_list_drive_items_follows_next_link(graph_client):
+    """Test that every page of a folder listing is returned."""
+    next_link = "https://graph.microsoft.com/v1.0/sites/s/drives/d/root/children?$skiptoken=2"
+    pages = [
+        {"value": [{"id": "1"}], "@odata.nextLink": next_link},
+        {"value": [{"id": "2"}]},
+    ]
+    with patch.object(graph_client, 'get', AsyncMock(side_effect=pages)) as mock_get:
+        result = asyncio.run(graph_client.list_drive_items("s", "d"))
+    
+    assert result == {"value": [{"id": "1"}, {"id": "2"}]}
+    assert mock_get.await_args_list[1].args == (next_link,)
+
+def test_iter_content_yields_chunks_and_closes():
+    """Test that a streaming response is read in chunks and closed afterwards."""
+    response = MagicMock()
+    response.iter_content.return_value = iter([b"ab", b"cd"])
+    
+    async def read_all():
+        return [chunk async for chunk in GraphClient.iter_content(response, chunk_size=2)]
+    
+    chunks = asyncio.run(read_all())
+    
+    assert chunks == [b"ab", b"cd"]
+    response.iter_content.assert_called_once_with(chunk_size=2)
+    response.close.assert_called_once()
+
+def test_get_drive_item_by_path_missing(graph_client):
+    """Test that a missing path returns None instead of raising."""
+    response = MagicMock(status_code=404)
+    with patch('requests.Session.get', return_value=response) as mock_get:
+        assert asyncio.run(graph_client.get_drive_item_by_path("s", "d", "Reports/q 1.xlsx")) is None
+    
+    assert mock_get.call_args.args[0].endswith("/drives/d/root:/Reports/q%201.xlsx")
+
+def test_search_drive_items_escapes_query(graph_client):
+    """Test that quotes in the search text are escaped for the OData literal."""
+    with patch.object(graph_client, 'get', AsyncMock(return_value={"value": []})) as mock_get:
+        asyncio.run(graph_client.search_drive_items("s", "d", "it's"))
+    
+    assert mock_get.await_args.args[0] == "sites/s/drives/d/root/search(q='it%27%27s')"
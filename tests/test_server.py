@@ -0,0 +1,156 @@
+import asyncio
+import pytest
+import requests
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi.testclient import TestClient
+
+import server
+from auth.sharepoint_auth import SharePointContext
+
+@pytest.fixture
+def client(monkeypatch):
+    """Create a REST test client with authentication and SharePoint access mocked."""
+    context = SharePointContext(
+        access_token="test_token",
+        token_expiry=datetime.now() + timedelta(hours=1)
+    )
+    monkeypatch.setattr(server, "get_token_context", AsyncMock(return_value=context))
+    server._list_files_cache.clear()
+    server._file_content_cache.clear()
+
+    with TestClient(server.create_app(transport="rest"), raise_server_exceptions=False) as test_client:
+        yield test_client
+
+def _stream(*chunks):
+    """Build a mock stream_site_file returning the given chunks."""
+    async def chunk_iter():
+        for chunk in chunks:
+            yield chunk
+    return AsyncMock(return_value=chunk_iter())
+
+def test_json_responses_are_gzipped(client, monkeypatch):
+    """Test that large JSON responses are compressed."""
+    files = [{"name": f"file{i}.docx"} for i in range(100)]
+    monkeypatch.setattr(server, "list_site_files", AsyncMock(return_value=files))
+
+    response = client.get("/list_files", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == files
+
+def test_file_downloads_are_not_gzipped(client, monkeypatch):
+    """Test that streamed file downloads are passed through uncompressed."""
+    monkeypatch.setattr(server, "stream_site_file", _stream(b"%PDF" * 1024))
+
+    response = client.get("/get_file_content?filename=report.pdf&stream=true",
+                          headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.content == b"%PDF" * 1024
+
+def test_list_files_fields_share_cache_entry(client, monkeypatch):
+    """Test that equivalent field selections are loaded once and projected in a fixed order."""
+    list_files = AsyncMock(return_value=[{"name": "a.txt", "size": 1}])
+    monkeypatch.setattr(server, "list_site_files", list_files)
+
+    for fields in ("name,size", "size,name", "name,size,name"):
+        assert client.get(f"/list_files?fields={fields}").status_code == 200
+    list_files.assert_awaited_once()
+    assert list_files.await_args.args[2] == ("name", "size")
+
+@pytest.mark.parametrize("fields", ["", "%20,%20", "name,bogus"])
+def test_list_files_rejects_bad_fields(client, monkeypatch, fields):
+    """Test that empty or unknown field selections are rejected."""
+    monkeypatch.setattr(server, "list_site_files", AsyncMock(return_value=[]))
+
+    response = client.get(f"/list_files?fields={fields}")
+    assert response.status_code == 400
+
+def test_etag_not_modified(client, monkeypatch):
+    """Test that a matching If-None-Match answers 304 with an empty body."""
+    monkeypatch.setattr(server, "list_site_files", AsyncMock(return_value=[{"name": "a.txt"}]))
+
+    response = client.get("/list_files")
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+
+    cached = client.get("/list_files", headers={"If-None-Match": f'"other", {etag}'})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+def test_etag_mismatch_and_wildcard(client, monkeypatch):
+    """Test that a stale tag gets the full body and * matches any current representation."""
+    monkeypatch.setattr(server, "list_site_files", AsyncMock(return_value=[{"name": "a.txt"}]))
+
+    stale = client.get("/list_files", headers={"If-None-Match": 'W/"stale"'})
+    assert stale.status_code == 200
+    assert stale.json() == [{"name": "a.txt"}]
+
+    assert client.get("/list_files", headers={"If-None-Match": "*"}).status_code == 304
+
+@pytest.mark.parametrize("error, status", [
+    (FileNotFoundError("File not found: a.txt"), 404),
+    (server.AmbiguousFileError("Several files are named a.txt"), 409),
+    (requests.Timeout("read timed out"), 502),
+    (RuntimeError("boom"), 500),
+])
+def test_errors_are_mapped(client, monkeypatch, error, status):
+    """Test that tool errors are mapped to HTTP status codes."""
+    monkeypatch.setattr(server, "read_site_file", AsyncMock(side_effect=error))
+
+    response = client.get("/get_file_content?filename=a.txt")
+    assert response.status_code == status
+    assert response.json() == {"detail": str(error)}
+
+def test_file_download_headers(client, monkeypatch):
+    """Test that streamed downloads carry the file's type and an encoded filename."""
+    monkeypatch.setattr(server, "stream_site_file", _stream(b"a", b"b"))
+
+    response = client.get("/get_file_content", params={"filename": "Reports/Q1 report.pdf", "stream": "true"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["content-disposition"] == "attachment; filename*=UTF-8''Q1%20report.pdf"
+    assert response.content == b"ab"
+
+def test_file_download_not_found(client, monkeypatch):
+    """Test that a missing file is a 404 for streamed downloads too."""
+    monkeypatch.setattr(server, "stream_site_file", AsyncMock(side_effect=FileNotFoundError("File not found: x")))
+
+    assert client.get("/get_file_content?filename=x&stream=true").status_code == 404
+
+def test_token_refresher_finishes_on_exit():
+    """Test that no token refresher task is left pending when the context exits."""
+    context = SharePointContext(access_token="test_token", token_expiry=datetime.now() + timedelta(hours=1))
+
+    async def pending_tasks_after_exit():
+        async with server._authenticated_context(AsyncMock(return_value=context)):
+            pass
+        return asyncio.all_tasks() - {asyncio.current_task()}
+
+    assert asyncio.run(pending_tasks_after_exit()) == set()
+
+@pytest.mark.parametrize("transport", ["both", "jsonrpc"])
+def test_mcp_shares_the_app_context(monkeypatch, transport):
+    """Test that serving MCP alongside the app authenticates once, without the site probes."""
+    context = SharePointContext(access_token="test_token", token_expiry=datetime.now() + timedelta(hours=1))
+    get_token_context = AsyncMock(return_value=context)
+    monkeypatch.setattr(server, "get_token_context", get_token_context)
+    monkeypatch.setattr("auth.sharepoint_auth.get_auth_context", AsyncMock(side_effect=AssertionError("probes the site")))
+
+    with TestClient(server.create_app(transport=transport)):
+        pass
+
+    get_token_context.assert_awaited_once()
+
+def test_cache_hits_are_not_reencoded(client, monkeypatch):
+    """Test that cached responses reuse their encoded body and ETag."""
+    monkeypatch.setattr(server, "read_site_file", AsyncMock(return_value={"type": "text"}))
+    encode_json = MagicMock(wraps=server._encode_json)
+    monkeypatch.setattr(server, "_encode_json", encode_json)
+
+    etag = client.get("/get_file_content?filename=a.txt").headers["etag"]
+    assert client.get("/get_file_content?filename=a.txt").json() == {"type": "text"}
+    assert client.get("/get_file_content?filename=a.txt", headers={"If-None-Match": etag}).status_code == 304
+
+    encode_json.assert_called_once()
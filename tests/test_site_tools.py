@@ -0,0 +1,118 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import tools.site_tools as site_tools
+from tools.site_tools import AmbiguousFileError, _collect_files, _find_file, register_site_tools
+
+def test_register_site_tools_is_idempotent():
+    """Test that registering tools twice on the same server is a no-op."""
+    mcp = SimpleNamespace(tool=MagicMock(return_value=lambda func: func))
+    
+    register_site_tools(mcp)
+    registered = mcp.tool.call_count
+    assert registered > 0
+    
+    register_site_tools(mcp)
+    assert mcp.tool.call_count == registered
+
+def test_collect_files_selects_requested_fields():
+    """Test that only the requested fields are fetched from Graph and returned."""
+    graph_client = MagicMock()
+    graph_client.list_drives = AsyncMock(return_value={"value": [{"id": "d1", "name": "Documents"}]})
+    graph_client.list_drive_items = AsyncMock(return_value={"value": [
+        {"id": "i1", "name": "report.docx", "size": 10, "file": {}},
+    ]})
+    
+    files = asyncio.run(_collect_files(graph_client, "site", fields={"name", "size"}))
+    
+    assert files == [{"name": "report.docx", "size": 10}]
+    graph_client.list_drive_items.assert_awaited_once_with(
+        "site", "d1", select=["id", "file", "folder", "name", "size"], folder_id=None
+    )
+
+def test_collect_files_walks_subfolders():
+    """Test that files inside subfolders are listed too."""
+    folders = {
+        None: [{"id": "f1", "name": "Reports", "folder": {}}, {"id": "i1", "name": "a.txt", "file": {}}],
+        "f1": [{"id": "i2", "name": "b.txt", "file": {}}],
+    }
+    graph_client = MagicMock()
+    graph_client.list_drives = AsyncMock(return_value={"value": [{"id": "d1", "name": "Documents"}]})
+    graph_client.list_drive_items = AsyncMock(
+        side_effect=lambda site_id, drive_id, select, folder_id: {"value": folders[folder_id]}
+    )
+    
+    files = asyncio.run(_collect_files(graph_client, "site", fields={"name"}))
+    
+    assert files == [{"name": "a.txt"}, {"name": "b.txt"}]
+
+def _lookup_client(search_hits, root_item=None):
+    """Create a mock Graph client for file lookups in a single library."""
+    graph_client = MagicMock()
+    graph_client.list_drives = AsyncMock(return_value={"value": [{"id": "d1", "name": "Documents"}]})
+    graph_client.search_drive_items = AsyncMock(return_value={"value": search_hits})
+    graph_client.get_drive_item_by_path = AsyncMock(return_value=root_item)
+    return graph_client
+
+def test_find_file_uses_search():
+    """Test that a name is resolved by searching each library, not by listing folders."""
+    graph_client = _lookup_client([
+        {"id": "i1", "name": "a.txt", "file": {}, "parentReference": {"path": "/drives/d1/root:/Reports"}},
+        {"id": "i2", "name": "a.txt.bak", "file": {}},
+    ])
+    
+    file_info = asyncio.run(_find_file(graph_client, "site", "a.txt"))
+    
+    assert (file_info["id"], file_info["drive_id"], file_info["location"]) == ("i1", "d1", "Reports/a.txt")
+    graph_client.list_drive_items.assert_not_called()
+
+def test_find_file_falls_back_to_root_folder():
+    """Test that files not yet in the search index are found in the library root."""
+    graph_client = _lookup_client([], root_item={"id": "i1", "name": "new.txt", "file": {}})
+    
+    assert asyncio.run(_find_file(graph_client, "site", "new.txt"))["id"] == "i1"
+    graph_client.get_drive_item_by_path.assert_awaited_once()
+
+def test_find_file_by_path():
+    """Test that a path from the library root is resolved directly."""
+    graph_client = _lookup_client([], root_item={"id": "i1", "name": "a.txt", "file": {}})
+    
+    assert asyncio.run(_find_file(graph_client, "site", "Reports/a.txt"))["id"] == "i1"
+    graph_client.search_drive_items.assert_not_called()
+    assert graph_client.get_drive_item_by_path.await_args.args[2] == "Reports/a.txt"
+
+def test_find_file_rejects_ambiguous_names():
+    """Test that a name matching files in several folders is an error, not the first hit."""
+    graph_client = _lookup_client([
+        {"id": "i1", "name": "a.txt", "file": {}, "parentReference": {"path": "/drives/d1/root:"}},
+        {"id": "i2", "name": "a.txt", "file": {}, "parentReference": {"path": "/drives/d1/root:/Old"}},
+    ])
+    
+    with pytest.raises(AmbiguousFileError, match="Old/a.txt"):
+        asyncio.run(_find_file(graph_client, "site", "a.txt"))
+
+def test_find_file_not_found():
+    """Test that a missing file raises FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(_find_file(_lookup_client([]), "site", "missing.txt"))
+
+def test_file_locations_are_cached_and_coalesced():
+    """Test that concurrent and repeated reads of a file look it up once."""
+    site_tools._file_location_cache.clear()
+    graph_client = _lookup_client([{"id": "i1", "name": "a.txt", "file": {}}])
+    graph_client.get_site_info = AsyncMock(return_value={"id": "site"})
+    
+    async def locate_three_times():
+        first = await asyncio.gather(*(site_tools._locate_file(graph_client, "a.txt") for _ in range(2)))
+        return first + [await site_tools._locate_file(graph_client, "a.txt")]
+    
+    locations = asyncio.run(locate_three_times())
+    
+    assert [site_id for site_id, _ in locations] == ["site"] * 3
+    graph_client.get_site_info.assert_awaited_once()
+    graph_client.search_drive_items.assert_awaited_once()
+    
+    site_tools._forget_file_location("a.txt")
+    assert len(site_tools._file_location_cache) == 0
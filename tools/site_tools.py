@@ -1,22 +1,273 @@
 """SharePoint site information tools."""
 
-import json
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional, AsyncIterator, Tuple
 
+import orjson
 from fastmcp import FastMCP, Context
 
-from auth.sharepoint_auth import refresh_token_if_needed
+from auth.sharepoint_auth import SharePointContext, refresh_token_if_needed
+from utils.cache import SingleFlight, TTLCache
 from utils.graph_client import GraphClient
 from utils.document_processor import DocumentProcessor
 from utils.content_generator import ContentGenerator
-from config.settings import SHAREPOINT_CONFIG
+from config.settings import SHAREPOINT_CONFIG, CACHE_CONFIG
 
 # Set up logging
 logger = logging.getLogger("sharepoint_tools")
 
+def _to_json(data: Any) -> str:
+    """Serialize a tool result as indented JSON using orjson."""
+    return orjson.dumps(
+        data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    ).decode()
+
+async def _get_site_id(graph_client: GraphClient) -> str:
+    """Resolve the ID of the configured SharePoint site."""
+    site_parts = SHAREPOINT_CONFIG["site_url"].replace("https://", "").split("/")
+    domain = site_parts[0]
+    site_name = site_parts[2] if len(site_parts) > 2 else "root"
+    
+    site_info = await graph_client.get_site_info(domain, site_name)
+    site_id = site_info.get("id")
+    if not site_id:
+        raise Exception("Could not retrieve site ID")
+    return site_id
+
+# Keys returned for each file by list_site_files, with the driveItem property
+# each one is read from (None for keys filled in from the drive)
+FILE_FIELDS = {
+    "name": "name",
+    "id": "id",
+    "size": "size",
+    "last_modified": "lastModifiedDateTime",
+    "web_url": "webUrl",
+    "drive_id": None,
+    "drive_name": None,
+}
+
+async def _collect_files(graph_client: GraphClient, site_id: str, concurrency: int = 8,
+                         fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """Collect the files in every document library of a site, including subfolders.
+    
+    Folders are listed concurrently, at most `concurrency` at a time. Only the
+    requested `fields` (keys of FILE_FIELDS, all by default) are fetched from
+    Graph and returned.
+    """
+    keys = [key for key in FILE_FIELDS if fields is None or key in fields]
+    # "id", "file" and "folder" are always needed to tell files from folders and walk them
+    select = ["id", "file", "folder"] + [
+        FILE_FIELDS[key] for key in keys if FILE_FIELDS[key] not in (None, "id")
+    ]
+    
+    drives = (await graph_client.list_drives(site_id)).get("value", [])
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    
+    async def folder_files(drive: Dict[str, Any], folder_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        async with semaphore:
+            items = await graph_client.list_drive_items(site_id, drive["id"], select=select, folder_id=folder_id)
+        
+        files = []
+        subfolders = []
+        for item in items.get("value", []):
+            if "folder" in item:
+                subfolders.append(item["id"])
+                continue
+            # Skip other non-file items
+            if "file" not in item:
+                continue
+            file_info = {
+                "name": item.get("name", "Unknown"),
+                "id": item.get("id", "Unknown"),
+                "size": item.get("size", 0),
+                "last_modified": item.get("lastModifiedDateTime", "Unknown"),
+                "web_url": item.get("webUrl", "Unknown"),
+                "drive_id": drive["id"],
+                "drive_name": drive.get("name", "Unknown"),
+            }
+            files.append({key: file_info[key] for key in keys})
+        
+        nested = await asyncio.gather(*(folder_files(drive, subfolder) for subfolder in subfolders))
+        return files + [file_info for sub_files in nested for file_info in sub_files]
+    
+    results = await asyncio.gather(*(folder_files(drive) for drive in drives))
+    return [file_info for files in results for file_info in files]
+
+async def list_site_files(sp_ctx: SharePointContext, concurrency: int = 8,
+                          fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """List the files in the document libraries of the configured site.
+    
+    Args:
+        sp_ctx: SharePoint authentication context
+        concurrency: Maximum number of folders listed at once
+        fields: Keys of FILE_FIELDS to include per file; all if omitted
+        
+    Returns:
+        File metadata for every file found
+        
+    Raises:
+        ValueError: If fields is empty or contains an unknown key
+    """
+    if fields is not None:
+        if not fields:
+            raise ValueError("No file fields requested")
+        unknown = set(fields) - set(FILE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown file fields: {', '.join(sorted(unknown))}")
+    
+    await refresh_token_if_needed(sp_ctx)
+    graph_client = GraphClient(sp_ctx)
+    site_id = await _get_site_id(graph_client)
+    return await _collect_files(graph_client, site_id, concurrency, fields)
+
+class AmbiguousFileError(Exception):
+    """Raised when a file name matches files in more than one folder or library."""
+
+# driveItem properties needed to locate a file and tell the user where it is
+_LOOKUP_SELECT = ["id", "name", "file", "parentReference", "webUrl"]
+
+def _item_location(item: Dict[str, Any]) -> str:
+    """Describe where a drive item is, preferably as its path from the library root."""
+    parent = item.get("parentReference", {}).get("path")
+    if not parent:
+        # Search results may omit the parent path
+        return item.get("webUrl", item["name"])
+    folder = parent.split("root:", 1)[1].strip("/") if "root:" in parent else ""
+    return f"{folder}/{item['name']}" if folder else item["name"]
+
+async def _find_file(graph_client: GraphClient, site_id: str, filename: str) -> Dict[str, Any]:
+    """Find a file by name, or by path from its library root, across the libraries of a site.
+    
+    Names are looked up with one search per library instead of listing every
+    folder; files not yet in the search index are still found in the root folder.
+    
+    Raises:
+        FileNotFoundError: If no library contains the file
+        AmbiguousFileError: If the name matches files in several places
+    """
+    drives = (await graph_client.list_drives(site_id)).get("value", [])
+    by_path = "/" in filename.strip("/")
+    
+    async def drive_matches(drive: Dict[str, Any]) -> List[Dict[str, Any]]:
+        items = []
+        if not by_path:
+            found = await graph_client.search_drive_items(site_id, drive["id"], filename, select=_LOOKUP_SELECT)
+            # Search also matches on content and partial names
+            items = [item for item in found.get("value", []) if item.get("name") == filename]
+        if not items:
+            item = await graph_client.get_drive_item_by_path(site_id, drive["id"], filename, select=_LOOKUP_SELECT)
+            items = [item] if item else []
+        
+        return [
+            {
+                "name": item["name"],
+                "id": item["id"],
+                "drive_id": drive["id"],
+                "drive_name": drive.get("name", "Unknown"),
+                "location": _item_location(item),
+            }
+            for item in items
+            if "file" in item
+        ]
+    
+    results = await asyncio.gather(*(drive_matches(drive) for drive in drives))
+    matches = [file_info for files in results for file_info in files]
+    
+    if not matches:
+        raise FileNotFoundError(f"File not found: {filename}")
+    if len(matches) > 1:
+        locations = ", ".join(f"{match['drive_name']}: {match['location']}" for match in matches)
+        raise AmbiguousFileError(
+            f"Several files are named {filename} ({locations}); pass the path from the library root instead"
+        )
+    return matches[0]
+
+# Where requested files were found. Item IDs stay valid until the file is moved
+# or deleted, so repeated reads and downloads skip the site and library lookups
+_file_location_cache = TTLCache(
+    ttl=CACHE_CONFIG["file_lookup_ttl"], maxsize=CACHE_CONFIG["file_lookup_max_entries"]
+)
+_file_location_inflight = SingleFlight()
+
+async def _locate_file(graph_client: GraphClient, filename: str) -> Tuple[str, Dict[str, Any]]:
+    """Find the site ID and file info for a file name, cached and coalesced per name."""
+    cache_key = (SHAREPOINT_CONFIG["site_url"], filename)
+    location = _file_location_cache.get(cache_key)
+    if location is not None:
+        return location
+    
+    async def lookup() -> Tuple[str, Dict[str, Any]]:
+        site_id = await _get_site_id(graph_client)
+        location = (site_id, await _find_file(graph_client, site_id, filename))
+        _file_location_cache.set(cache_key, location)
+        return location
+    
+    return await _file_location_inflight.do(cache_key, lookup)
+
+def _forget_file_location(filename: str) -> None:
+    """Drop a cached file location, e.g. after the file moved or was deleted."""
+    _file_location_cache.delete((SHAREPOINT_CONFIG["site_url"], filename))
+
+async def read_site_file(sp_ctx: SharePointContext, filename: str) -> Dict[str, Any]:
+    """Get and process the content of a file in the configured site by name.
+    
+    Args:
+        sp_ctx: SharePoint authentication context
+        filename: Name of the file, or its path from the library root
+        
+    Returns:
+        Processed document content
+        
+    Raises:
+        FileNotFoundError: If no document library contains the file
+        AmbiguousFileError: If several files have that name
+    """
+    await refresh_token_if_needed(sp_ctx)
+    graph_client = GraphClient(sp_ctx)
+    site_id, file_info = await _locate_file(graph_client, filename)
+    
+    try:
+        content = await graph_client.get_document_content(site_id, file_info["drive_id"], file_info["id"])
+    except Exception:
+        _forget_file_location(filename)
+        raise
+    return DocumentProcessor.process_document(content, filename)
+
+async def stream_site_file(sp_ctx: SharePointContext, filename: str) -> AsyncIterator[bytes]:
+    """Open a file in the configured site by name for a streaming download.
+    
+    Args:
+        sp_ctx: SharePoint authentication context
+        filename: Name of the file, or its path from the library root
+        
+    Returns:
+        Async iterator over the raw file bytes
+        
+    Raises:
+        FileNotFoundError: If no document library contains the file
+        AmbiguousFileError: If several files have that name
+    """
+    await refresh_token_if_needed(sp_ctx)
+    graph_client = GraphClient(sp_ctx)
+    site_id, file_info = await _locate_file(graph_client, filename)
+    
+    try:
+        response = await graph_client.open_document_stream(site_id, file_info["drive_id"], file_info["id"])
+    except Exception:
+        _forget_file_location(filename)
+        raise
+    return GraphClient.iter_content(response)
+
 def register_site_tools(mcp: FastMCP):
-    """Register SharePoint site tools with the MCP server."""
+    """Register SharePoint site tools with the MCP server.
+    
+    Safe to call more than once; tools are only registered on the first call.
+    """
+    # Re-imports (worker spawn, reloaders, test harnesses) must not register twice
+    if getattr(mcp, "_sp_tools_registered", False):
+        return
+    mcp._sp_tools_registered = True
     
     @mcp.tool()
     async def get_site_info(ctx: Context) -> str:
@@ -38,7 +289,7 @@ def register_site_tools(mcp: FastMCP):
             domain = site_parts[0]
             site_name = site_parts[2] if len(site_parts) > 2 else "root"
             
-            logger.info(f"Getting info for site: {site_name} in domain: {domain}")
+            logger.info("Getting info for site: %s in domain: %s", site_name, domain)
             
             # Get site info using Graph client
             site_info = await graph_client.get_site_info(domain, site_name)
@@ -53,11 +304,11 @@ def register_site_tools(mcp: FastMCP):
                 "id": site_info.get("id", "Unknown")
             }
             
-            logger.info(f"Successfully retrieved site info for: {result['name']}")
-            return json.dumps(result, indent=2)
+            logger.info("Successfully retrieved site info for: %s", result['name'])
+            return _to_json(result)
             
         except Exception as e:
-            logger.error(f"Error in get_site_info: {str(e)}")
+            logger.error("Error in get_site_info: %s", e)
             return f"Error accessing SharePoint: {str(e)}"
             
     @mcp.tool()
@@ -80,7 +331,7 @@ def register_site_tools(mcp: FastMCP):
             domain = site_parts[0]
             site_name = site_parts[2] if len(site_parts) > 2 else "root"
             
-            logger.info(f"Listing document libraries for site: {site_name} in domain: {domain}")
+            logger.info("Listing document libraries for site: %s in domain: %s", site_name, domain)
             
             # List document libraries using Graph client
             result = await graph_client.list_document_libraries(domain, site_name)
@@ -95,11 +346,11 @@ def register_site_tools(mcp: FastMCP):
                     "id": drive.get("id", "Unknown")
                 } for drive in drives]
             
-            logger.info(f"Successfully retrieved {len(formatted_drives)} document libraries")
-            return json.dumps(formatted_drives, indent=2)
+            logger.info("Successfully retrieved %s document libraries", len(formatted_drives))
+            return _to_json(formatted_drives)
             
         except Exception as e:
-            logger.error(f"Error in list_document_libraries: {str(e)}")
+            logger.error("Error in list_document_libraries: %s", e)
             return f"Error accessing SharePoint document libraries: {str(e)}"
             
     @mcp.tool()
@@ -109,7 +360,7 @@ def register_site_tools(mcp: FastMCP):
         Args:
             query: Search query string
         """
-        logger.info(f"Tool called: search_sharepoint with query: {query}")
+        logger.info("Tool called: search_sharepoint with query: %s", query)
         
         try:
             # Get authentication context from context object
@@ -126,7 +377,7 @@ def register_site_tools(mcp: FastMCP):
             domain = site_parts[0]
             site_name = site_parts[2] if len(site_parts) > 2 else "root"
             
-            logger.info(f"Searching for '{query}' in site: {site_name}")
+            logger.info("Searching for '%s' in site: %s", query, site_name)
             
             # First get site info to get site ID
             site_info = await graph_client.get_site_info(domain, site_name)
@@ -153,7 +404,7 @@ def register_site_tools(mcp: FastMCP):
                 ]
             }
             
-            logger.debug(f"Search request: {search_data}")
+            logger.debug("Search request: %s", search_data)
             search_results = await graph_client.post(search_url, search_data)
             
             # Format search results
@@ -167,11 +418,11 @@ def register_site_tools(mcp: FastMCP):
                         "summary": hit.get("summary", "No summary available")
                     })
             
-            logger.info(f"Search returned {len(formatted_results)} results")
-            return json.dumps(formatted_results, indent=2)
+            logger.info("Search returned %s results", len(formatted_results))
+            return _to_json(formatted_results)
             
         except Exception as e:
-            logger.error(f"Error in search_sharepoint: {str(e)}")
+            logger.error("Error in search_sharepoint: %s", e)
             return f"Error searching SharePoint: {str(e)}"
     
     @mcp.tool()
@@ -183,7 +434,7 @@ def register_site_tools(mcp: FastMCP):
             alias: Site alias (used in URL)
             description: Site description
         """
-        logger.info(f"Tool called: create_sharepoint_site with name: {display_name}, alias: {alias}")
+        logger.info("Tool called: create_sharepoint_site with name: %s, alias: %s", display_name, alias)
         
         try:
             # Get authentication context and refresh if needed
@@ -196,10 +447,10 @@ def register_site_tools(mcp: FastMCP):
             # Create the site
             site_info = await graph_client.create_site(display_name, alias, description)
             
-            logger.info(f"Successfully created site: {display_name}")
-            return json.dumps(site_info, indent=2)
+            logger.info("Successfully created site: %s", display_name)
+            return _to_json(site_info)
         except Exception as e:
-            logger.error(f"Error in create_sharepoint_site: {str(e)}")
+            logger.error("Error in create_sharepoint_site: %s", e)
             return f"Error creating SharePoint site: {str(e)}"
     
     @mcp.tool()
@@ -211,7 +462,7 @@ def register_site_tools(mcp: FastMCP):
             purpose: Purpose of the list (projects, events, tasks, contacts, documents)
             display_name: Display name for the list
         """
-        logger.info(f"Tool called: create_intelligent_list with purpose: {purpose}, name: {display_name}")
+        logger.info("Tool called: create_intelligent_list with purpose: %s, name: %s", purpose, display_name)
         
         try:
             # Get authentication context and refresh if needed
@@ -224,10 +475,10 @@ def register_site_tools(mcp: FastMCP):
             # Create the intelligent list
             list_info = await graph_client.create_intelligent_list(site_id, purpose, display_name)
             
-            logger.info(f"Successfully created intelligent list: {display_name}")
-            return json.dumps(list_info, indent=2)
+            logger.info("Successfully created intelligent list: %s", display_name)
+            return _to_json(list_info)
         except Exception as e:
-            logger.error(f"Error in create_intelligent_list: {str(e)}")
+            logger.error("Error in create_intelligent_list: %s", e)
             return f"Error creating intelligent list: {str(e)}"
     
     @mcp.tool()
@@ -242,7 +493,7 @@ def register_site_tools(mcp: FastMCP):
         Returns:
             Created list item information
         """
-        logger.info(f"Tool called: create_list_item in list: {list_id}")
+        logger.info("Tool called: create_list_item in list: %s", list_id)
         
         try:
             # Get authentication context and refresh if needed
@@ -255,10 +506,10 @@ def register_site_tools(mcp: FastMCP):
             # Create the list item
             item_info = await graph_client.create_list_item(site_id, list_id, fields)
             
-            logger.info(f"Successfully created list item in list: {list_id}")
-            return json.dumps(item_info, indent=2)
+            logger.info("Successfully created list item in list: %s", list_id)
+            return _to_json(item_info)
         except Exception as e:
-            logger.error(f"Error in create_list_item: {str(e)}")
+            logger.error("Error in create_list_item: %s", e)
             return f"Error creating list item: {str(e)}"
     
     @mcp.tool()
@@ -275,7 +526,7 @@ def register_site_tools(mcp: FastMCP):
         Returns:
             Updated list item information
         """
-        logger.info(f"Tool called: update_list_item for item: {item_id} in list: {list_id}")
+        logger.info("Tool called: update_list_item for item: %s in list: %s", item_id, list_id)
         
         try:
             # Get authentication context and refresh if needed
@@ -288,10 +539,10 @@ def register_site_tools(mcp: FastMCP):
             # Update the list item
             item_info = await graph_client.update_list_item(site_id, list_id, item_id, fields)
             
-            logger.info(f"Successfully updated list item {item_id} in list: {list_id}")
-            return json.dumps(item_info, indent=2)
+            logger.info("Successfully updated list item %s in list: %s", item_id, list_id)
+            return _to_json(item_info)
         except Exception as e:
-            logger.error(f"Error in update_list_item: {str(e)}")
+            logger.error("Error in update_list_item: %s", e)
             return f"Error updating list item: {str(e)}"
     
     @mcp.tool()
@@ -304,7 +555,7 @@ def register_site_tools(mcp: FastMCP):
             display_name: Display name of the library
             doc_type: Type of documents (general, contracts, marketing, reports, projects)
         """
-        logger.info(f"Tool called: create_advanced_document_library with type: {doc_type}, name: {display_name}")
+        logger.info("Tool called: create_advanced_document_library with type: %s, name: %s", doc_type, display_name)
         
         try:
             # Get authentication context and refresh if needed
@@ -317,10 +568,10 @@ def register_site_tools(mcp: FastMCP):
             # Create the advanced document library
             library_info = await graph_client.create_advanced_document_library(site_id, display_name, doc_type)
             
-            logger.info(f"Successfully created advanced document library: {display_name}")
-            return json.dumps(library_info, indent=2)
+            logger.info("Successfully created advanced document library: %s", display_name)
+            return _to_json(library_info)
         except Exception as e:
-            logger.error(f"Error in create_advanced_document_library: {str(e)}")
+            logger.error("Error in create_advanced_document_library: %s", e)
             return f"Error creating advanced document library: {str(e)}"
     
     @mcp.tool()
@@ -340,7 +591,7 @@ def register_site_tools(mcp: FastMCP):
         Returns:
             Created document information
         """
-        logger.info(f"Tool called: upload_document with name: {file_name}")
+        logger.info("Tool called: upload_document with name: %s", file_name)
         
         try:
             # Get authentication context and refresh if needed
@@ -355,10 +606,10 @@ def register_site_tools(mcp: FastMCP):
                 site_id, drive_id, folder_path, file_name, file_content, content_type
             )
             
-            logger.info(f"Successfully uploaded document: {file_name}")
-            return json.dumps(doc_info, indent=2)
+            logger.info("Successfully uploaded document: %s", file_name)
+            return _to_json(doc_info)
         except Exception as e:
-            logger.error(f"Error in upload_document: {str(e)}")
+            logger.error("Error in upload_document: %s", e)
             return f"Error uploading document: {str(e)}"
     
     @mcp.tool()
@@ -372,7 +623,7 @@ def register_site_tools(mcp: FastMCP):
             purpose: Purpose of the page (welcome, dashboard, team, project, announcement)
             audience: Target audience (general, executives, team, customers)
         """
-        logger.info(f"Tool called: create_modern_page with name: {name}, purpose: {purpose}")
+        logger.info("Tool called: create_modern_page with name: %s, purpose: %s", name, purpose)
         
         try:
             # Get authentication context and refresh if needed
@@ -412,10 +663,10 @@ def register_site_tools(mcp: FastMCP):
                 }
             }
             
-            logger.info(f"Successfully created and published modern page: {name}")
-            return json.dumps(result, indent=2)
+            logger.info("Successfully created and published modern page: %s", name)
+            return _to_json(result)
         except Exception as e:
-            logger.error(f"Error in create_modern_page: {str(e)}")
+            logger.error("Error in create_modern_page: %s", e)
             return f"Error creating modern page: {str(e)}"
     
     @mcp.tool()
@@ -432,7 +683,7 @@ def register_site_tools(mcp: FastMCP):
         Returns:
             Created news post information
         """
-        logger.info(f"Tool called: create_news_post with title: {title}")
+        logger.info("Tool called: create_news_post with title: %s", title)
         
         try:
             # Get authentication context and refresh if needed
@@ -447,10 +698,10 @@ def register_site_tools(mcp: FastMCP):
                 site_id, title, description, content, promote=True
             )
             
-            logger.info(f"Successfully created news post: {title}")
-            return json.dumps(news_info, indent=2)
+            logger.info("Successfully created news post: %s", title)
+            return _to_json(news_info)
         except Exception as e:
-            logger.error(f"Error in create_news_post: {str(e)}")
+            logger.error("Error in create_news_post: %s", e)
             return f"Error creating news post: {str(e)}"
     
     @mcp.tool()
@@ -464,7 +715,7 @@ def register_site_tools(mcp: FastMCP):
             item_id: ID of the document
             filename: Name of the file (for content type detection)
         """
-        logger.info(f"Tool called: get_document_content for file: {filename}")
+        logger.info("Tool called: get_document_content for file: %s", filename)
         
         try:
             # Get authentication context and refresh if needed
@@ -480,8 +731,45 @@ def register_site_tools(mcp: FastMCP):
             # Process document content based on file type
             processed_content = DocumentProcessor.process_document(content, filename)
             
-            logger.info(f"Successfully processed document content for: {filename}")
-            return json.dumps(processed_content, indent=2)
+            logger.info("Successfully processed document content for: %s", filename)
+            return _to_json(processed_content)
         except Exception as e:
-            logger.error(f"Error in get_document_content: {str(e)}")
+            logger.error("Error in get_document_content: %s", e)
             return f"Error getting document content: {str(e)}"
+    
+    @mcp.tool()
+    async def list_files(ctx: Context, concurrency: int = 8, fields: Optional[List[str]] = None) -> str:
+        """List all files in the document libraries of the SharePoint site, including subfolders.
+        
+        Args:
+            concurrency: Maximum number of folders listed at once
+            fields: File fields to return (name, id, size, last_modified, web_url,
+                drive_id, drive_name); all if omitted
+        """
+        logger.info("Tool called: list_files")
+        
+        try:
+            files = await list_site_files(ctx.request_context.lifespan_context, concurrency, fields)
+            logger.info("Successfully listed %s files", len(files))
+            return _to_json(files)
+        except Exception as e:
+            logger.error("Error in list_files: %s", e)
+            return f"Error listing SharePoint files: {str(e)}"
+    
+    @mcp.tool()
+    async def get_file_content(ctx: Context, filename: str) -> str:
+        """Get and process the content of a file in the SharePoint site.
+        
+        Args:
+            filename: Name of the file, or its path from the library root
+                (e.g. "Reports/q1.xlsx") when several files share the name
+        """
+        logger.info("Tool called: get_file_content for file: %s", filename)
+        
+        try:
+            processed_content = await read_site_file(ctx.request_context.lifespan_context, filename)
+            logger.info("Successfully processed file content for: %s", filename)
+            return _to_json(processed_content)
+        except Exception as e:
+            logger.error("Error in get_file_content: %s", e)
+            return f"Error getting file content: {str(e)}"
@@ -0,0 +1,84 @@
+"""In-process caches for SharePoint MCP server."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a fixed time-to-live."""
+    
+    def __init__(self, ttl: float, maxsize: int = 128):
+        """Initialize the cache.
+        
+        Args:
+            ttl: Seconds an entry stays valid; 0 or less disables caching
+            maxsize: Maximum number of entries kept before evicting the oldest
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry if full."""
+        if self.ttl <= 0:
+            return
+        
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def delete(self, key: Hashable) -> None:
+        """Remove the entry for key, if any."""
+        self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into a single in-flight call."""
+    
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+    
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run func for key, or join the call already running for that key.
+        
+        Args:
+            key: Identifies calls that may share a result
+            func: Zero-argument coroutine function producing the result
+            
+        Returns:
+            The result of the (possibly shared) call
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        # Shield so that one cancelled caller does not cancel the call for the others
+        return await asyncio.shield(task)
+    
+    def __len__(self) -> int:
+        return len(self._inflight)
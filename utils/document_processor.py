@@ -59,7 +59,7 @@ class DocumentProcessor:
             else:
                 return {"error": f"Unsupported file type: {file_ext}"}
         except Exception as e:
-            logger.error(f"Error processing document: {str(e)}")
+            logger.error("Error processing document: %s", e)
             return {"error": str(e)}
     
     @staticmethod
@@ -150,7 +150,7 @@ class DocumentProcessor:
                 "category": props.category or ""
             }
         except Exception as e:
-            logger.warning(f"Error getting document properties: {str(e)}")
+            logger.warning("Error getting document properties: %s", e)
         
         # Extract sections and headings for document structure
         structure = []
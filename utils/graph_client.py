@@ -1,17 +1,46 @@
 """Microsoft Graph API client for SharePoint MCP server."""
 
+import asyncio
+import functools
 import requests
 import logging
 import json
 import base64
-from typing import Dict, Any, Optional, List, Union, BinaryIO
+from urllib.parse import quote
+from typing import Dict, Any, Optional, List, Union, BinaryIO, Callable, AsyncIterator
+
+import anyio
+from requests.adapters import HTTPAdapter
 
 from auth.sharepoint_auth import SharePointContext
+from config.settings import GRAPH_MAX_CONCURRENCY, GRAPH_POOL_SIZE, GRAPH_TIMEOUT
 
 # Set up logging
-logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 logger = logging.getLogger("graph_client")
 
+# Caps in-flight Graph requests per process so bursts stay under Graph's throttling limits
+_graph_semaphore = asyncio.Semaphore(GRAPH_MAX_CONCURRENCY)
+
+# One pooled session per process so Graph connections (and their TLS handshakes) are reused
+_session: Optional[requests.Session] = None
+
+def get_session() -> requests.Session:
+    """Get the shared HTTP session for Graph requests, creating it on first use."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        # Graph API calls and file downloads (redirected to SharePoint hosts) get separate
+        # per-host pools, each large enough that connections are reused rather than discarded
+        _session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=GRAPH_POOL_SIZE))
+    return _session
+
+def close_session() -> None:
+    """Close the shared HTTP session and its pooled connections."""
+    global _session
+    if _session is not None:
+        _session.close()
+        _session = None
+
 class GraphClient:
     """Client for interacting with Microsoft Graph API."""
     
@@ -23,13 +52,34 @@ class GraphClient:
         """
         self.context = context
         self.base_url = context.graph_url
-        logger.debug(f"GraphClient initialized with base URL: {self.base_url}")
+        self.session = get_session()
+        logger.debug("GraphClient initialized with base URL: %s", self.base_url)
+    
+    async def _send(self, request_func: Callable[..., requests.Response], *args, **kwargs) -> requests.Response:
+        """Run a blocking requests call in anyio's worker thread pool, bounded by the Graph semaphore.
+        
+        Requests time out after GRAPH_TIMEOUT unless a timeout is passed.
+        
+        Args:
+            request_func: Session method to call (e.g. self.session.get)
+            *args, **kwargs: Arguments passed through to request_func
+            
+        Returns:
+            The requests response
+            
+        Raises:
+            requests.Timeout: If Graph does not connect or answer in time
+        """
+        kwargs.setdefault("timeout", GRAPH_TIMEOUT)
+        async with _graph_semaphore:
+            return await anyio.to_thread.run_sync(functools.partial(request_func, *args, **kwargs))
     
     async def get(self, endpoint: str) -> Dict[str, Any]:
         """Send GET request to Graph API.
         
         Args:
-            endpoint: API endpoint path (without base URL)
+            endpoint: API endpoint path (without base URL), or a full Graph URL
+                such as an @odata.nextLink
             
         Returns:
             Response from the API as dictionary
@@ -37,21 +87,24 @@ class GraphClient:
         Raises:
             Exception: If the request fails
         """
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        logger.debug(f"Making GET request to: {url}")
+        if endpoint.startswith(self.base_url):
+            url = endpoint
+        else:
+            url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        logger.debug("Making GET request to: %s", url)
         
         # Get headers from context (including auth token)
         headers = self.context.headers
         
         # Send request
-        response = requests.get(url, headers=headers)
+        response = await self._send(self.session.get, url, headers=headers)
         
         # Log response
-        logger.debug(f"Response status code: {response.status_code}")
+        logger.debug("Response status code: %s", response.status_code)
         
         if response.status_code != 200:
             error_text = response.text
-            logger.error(f"Graph API error: {response.status_code} - {error_text}")
+            logger.error("Graph API error: %s - %s", response.status_code, error_text)
             
             # Log detailed info for auth errors
             if response.status_code in (401, 403):
@@ -79,21 +132,21 @@ class GraphClient:
             Exception: If the request fails
         """
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        logger.debug(f"Making POST request to: {url}")
-        logger.debug(f"With data: {data}")
+        logger.debug("Making POST request to: %s", url)
+        logger.debug("With data: %s", data)
         
         # Get headers from context (including auth token)
         headers = self.context.headers
         
         # Send request
-        response = requests.post(url, headers=headers, json=data)
+        response = await self._send(self.session.post, url, headers=headers, json=data)
         
         # Log response
-        logger.debug(f"Response status code: {response.status_code}")
+        logger.debug("Response status code: %s", response.status_code)
         
         if response.status_code not in (200, 201):
             error_text = response.text
-            logger.error(f"Graph API error: {response.status_code} - {error_text}")
+            logger.error("Graph API error: %s - %s", response.status_code, error_text)
             
             # Log detailed info for auth errors
             if response.status_code in (401, 403):
@@ -121,21 +174,21 @@ class GraphClient:
             Exception: If the request fails
         """
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        logger.debug(f"Making PATCH request to: {url}")
-        logger.debug(f"With data: {data}")
+        logger.debug("Making PATCH request to: %s", url)
+        logger.debug("With data: %s", data)
         
         # Get headers from context (including auth token)
         headers = self.context.headers
         
         # Send request
-        response = requests.patch(url, headers=headers, json=data)
+        response = await self._send(self.session.patch, url, headers=headers, json=data)
         
         # Log response
-        logger.debug(f"Response status code: {response.status_code}")
+        logger.debug("Response status code: %s", response.status_code)
         
         if response.status_code not in (200, 201, 204):
             error_text = response.text
-            logger.error(f"Graph API error: {response.status_code} - {error_text}")
+            logger.error("Graph API error: %s - %s", response.status_code, error_text)
             raise Exception(f"Graph API error: {response.status_code} - {error_text}")
         
         # Return successful response as JSON if available
@@ -156,20 +209,20 @@ class GraphClient:
             Exception: If the request fails
         """
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        logger.debug(f"Making DELETE request to: {url}")
+        logger.debug("Making DELETE request to: %s", url)
         
         # Get headers from context (including auth token)
         headers = self.context.headers
         
         # Send request
-        response = requests.delete(url, headers=headers)
+        response = await self._send(self.session.delete, url, headers=headers)
         
         # Log response
-        logger.debug(f"Response status code: {response.status_code}")
+        logger.debug("Response status code: %s", response.status_code)
         
         if response.status_code not in (200, 201, 204):
             error_text = response.text
-            logger.error(f"Graph API error: {response.status_code} - {error_text}")
+            logger.error("Graph API error: %s - %s", response.status_code, error_text)
             raise Exception(f"Graph API error: {response.status_code} - {error_text}")
         
         # Return successful status
@@ -190,7 +243,7 @@ class GraphClient:
             Exception: If the request fails
         """
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        logger.debug(f"Uploading file to: {url}")
+        logger.debug("Uploading file to: %s", url)
         
         # Get headers from context (including auth token)
         headers = self.context.headers.copy()
@@ -200,14 +253,14 @@ class GraphClient:
             headers['Content-Type'] = content_type
         
         # Send request
-        response = requests.put(url, headers=headers, data=file_content)
+        response = await self._send(self.session.put, url, headers=headers, data=file_content)
         
         # Log response
-        logger.debug(f"Response status code: {response.status_code}")
+        logger.debug("Response status code: %s", response.status_code)
         
         if response.status_code not in (200, 201, 204):
             error_text = response.text
-            logger.error(f"Graph API error: {response.status_code} - {error_text}")
+            logger.error("Graph API error: %s - %s", response.status_code, error_text)
             raise Exception(f"Graph API error: {response.status_code} - {error_text}")
         
         # Return successful response as JSON if available
@@ -226,7 +279,7 @@ class GraphClient:
             Site information
         """
         endpoint = f"sites/{domain}:/sites/{site_name}"
-        logger.info(f"Getting site info for domain: {domain}, site: {site_name}")
+        logger.info("Getting site info for domain: %s, site: %s", domain, site_name)
         return await self.get(endpoint)
     
     async def list_document_libraries(self, domain: str, site_name: str) -> Dict[str, Any]:
@@ -240,9 +293,108 @@ class GraphClient:
             List of document libraries
         """
         endpoint = f"sites/{domain}:/sites/{site_name}:/drives"
-        logger.info(f"Listing document libraries for domain: {domain}, site: {site_name}")
+        logger.info("Listing document libraries for domain: %s, site: %s", domain, site_name)
+        return await self.get(endpoint)
+    
+    async def list_drives(self, site_id: str) -> Dict[str, Any]:
+        """List all document libraries (drives) of a site by ID.
+        
+        Args:
+            site_id: ID of the site
+            
+        Returns:
+            List of drives
+        """
+        endpoint = f"sites/{site_id}/drives"
+        logger.info("Listing drives for site: %s", site_id)
         return await self.get(endpoint)
     
+    async def list_drive_items(self, site_id: str, drive_id: str,
+                               select: Optional[List[str]] = None,
+                               folder_id: Optional[str] = None) -> Dict[str, Any]:
+        """List the items in a folder of a document library, across all pages.
+        
+        Args:
+            site_id: ID of the site
+            drive_id: ID of the document library
+            select: driveItem properties to return ($select); all if omitted
+            folder_id: ID of the folder; the library's root folder if omitted
+            
+        Returns:
+            List of drive items
+        """
+        folder = f"items/{folder_id}" if folder_id else "root"
+        endpoint = f"sites/{site_id}/drives/{drive_id}/{folder}/children"
+        if select:
+            endpoint += f"?$select={','.join(select)}"
+        logger.info("Listing items in drive: %s, folder: %s", drive_id, folder_id or "root")
+        return await self._get_all_pages(endpoint)
+    
+    async def search_drive_items(self, site_id: str, drive_id: str, query: str,
+                                 select: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Search a document library, including subfolders, across all result pages.
+        
+        Args:
+            site_id: ID of the site
+            drive_id: ID of the document library
+            query: Search text matched against item names and content
+            select: driveItem properties to return ($select); all if omitted
+            
+        Returns:
+            List of matching drive items
+        """
+        # OData string literals escape a quote by doubling it
+        escaped = quote(query.replace("'", "''"), safe="")
+        endpoint = f"sites/{site_id}/drives/{drive_id}/root/search(q='{escaped}')"
+        if select:
+            endpoint += f"?$select={','.join(select)}"
+        logger.info("Searching drive %s for: %s", drive_id, query)
+        return await self._get_all_pages(endpoint)
+    
+    async def get_drive_item_by_path(self, site_id: str, drive_id: str, path: str,
+                                     select: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Get an item of a document library by its path from the library root.
+        
+        Args:
+            site_id: ID of the site
+            drive_id: ID of the document library
+            path: Item path relative to the library root (e.g. "Reports/q1.xlsx")
+            select: driveItem properties to return ($select); all if omitted
+            
+        Returns:
+            The drive item, or None if no item exists at that path
+        """
+        url = f"{self.base_url}/sites/{site_id}/drives/{drive_id}/root:/{quote(path.strip('/'))}"
+        if select:
+            url += f"?$select={','.join(select)}"
+        logger.debug("Getting drive item by path: %s", url)
+        
+        response = await self._send(self.session.get, url, headers=self.context.headers)
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            error_text = response.text
+            logger.error("Graph API error: %s - %s", response.status_code, error_text)
+            raise Exception(f"Graph API error: {response.status_code} - {error_text}")
+        return response.json()
+    
+    async def _get_all_pages(self, endpoint: str) -> Dict[str, Any]:
+        """GET a collection, following @odata.nextLink across pages.
+        
+        Args:
+            endpoint: API endpoint path of the collection
+            
+        Returns:
+            Dictionary whose "value" holds the items of every page
+        """
+        # Graph returns large collections in pages (200 items by default)
+        page = await self.get(endpoint)
+        items = page.get("value", [])
+        while "@odata.nextLink" in page:
+            page = await self.get(page["@odata.nextLink"])
+            items.extend(page.get("value", []))
+        return {"value": items}
+    
     async def create_site(self, display_name: str, alias: str, description: str = "") -> Dict[str, Any]:
         """Create a new SharePoint site.
         
@@ -260,7 +412,7 @@ class GraphClient:
             "alias": alias,
             "description": description
         }
-        logger.info(f"Creating new site with name: {display_name}, alias: {alias}")
+        logger.info("Creating new site with name: %s, alias: %s", display_name, alias)
         return await self.post(endpoint, data)
 
     async def create_list(self, site_id: str, display_name: str, 
@@ -284,7 +436,7 @@ class GraphClient:
             },
             "description": description
         }
-        logger.info(f"Creating new list with name: {display_name} in site: {site_id}")
+        logger.info("Creating new list with name: %s in site: %s", display_name, site_id)
         return await self.post(endpoint, data)
     
     async def create_list_item(self, site_id: str, list_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
@@ -302,7 +454,7 @@ class GraphClient:
         data = {
             "fields": fields
         }
-        logger.info(f"Creating new list item in list: {list_id}")
+        logger.info("Creating new list item in list: %s", list_id)
         return await self.post(endpoint, data)
     
     async def update_list_item(self, site_id: str, list_id: str, item_id: str, 
@@ -319,7 +471,7 @@ class GraphClient:
             Updated list item information
         """
         endpoint = f"sites/{site_id}/lists/{list_id}/items/{item_id}/fields"
-        logger.info(f"Updating list item {item_id} in list: {list_id}")
+        logger.info("Updating list item %s in list: %s", item_id, list_id)
         return await self.patch(endpoint, fields)
     
     async def delete_list_item(self, site_id: str, list_id: str, item_id: str) -> Dict[str, Any]:
@@ -334,7 +486,7 @@ class GraphClient:
             Status information
         """
         endpoint = f"sites/{site_id}/lists/{list_id}/items/{item_id}"
-        logger.info(f"Deleting list item {item_id} from list: {list_id}")
+        logger.info("Deleting list item %s from list: %s", item_id, list_id)
         return await self.delete(endpoint)
     
     async def add_column_to_list(self, site_id: str, list_id: str, column_def: Dict[str, Any]) -> Dict[str, Any]:
@@ -385,7 +537,7 @@ class GraphClient:
         if column_def.get("required", False):
             data["isRequired"] = True
         
-        logger.info(f"Adding column {column_def['name']} to list {list_id}")
+        logger.info("Adding column %s to list %s", column_def['name'], list_id)
         return await self.post(endpoint, data)
     
     async def create_page(self, site_id: str, name: str, title: str = "") -> Dict[str, Any]:
@@ -404,7 +556,7 @@ class GraphClient:
             "name": name,
             "title": title or name
         }
-        logger.info(f"Creating new page with name: {name} in site: {site_id}")
+        logger.info("Creating new page with name: %s in site: %s", name, site_id)
         return await self.post(endpoint, data)
     
     async def create_modern_page(self, site_id: str, name: str, title: str, 
@@ -427,7 +579,7 @@ class GraphClient:
             "layoutType": layout
         }
         
-        logger.info(f"Creating modern page with name: {name}, layout: {layout}")
+        logger.info("Creating modern page with name: %s, layout: %s", name, layout)
         return await self.post(endpoint, data)
     
     async def create_news_post(self, site_id: str, title: str, description: str = "", 
@@ -460,7 +612,7 @@ class GraphClient:
         data = {
             "promotionKind": "microsoftNewsService" if promote else "none"
         }
-        logger.info(f"Setting page {page_id} as news post")
+        logger.info("Setting page %s as news post", page_id)
         await self.post(endpoint, data)
         
         return {
@@ -486,7 +638,7 @@ class GraphClient:
         data = {
             "columnLayoutType": section_type
         }
-        logger.info(f"Adding {section_type} section to page {page_id}")
+        logger.info("Adding %s section to page %s", section_type, page_id)
         return await self.post(endpoint, data)
     
     async def add_web_part_to_section(self, site_id: str, page_id: str, section_id: str, 
@@ -510,7 +662,7 @@ class GraphClient:
             "type": web_part_type,
             "data": web_part_data
         }
-        logger.info(f"Adding {web_part_type} web part to page {page_id}")
+        logger.info("Adding %s web part to page %s", web_part_type, page_id)
         return await self.post(endpoint, data)
     
     async def update_page(self, site_id: str, page_id: str, 
@@ -553,7 +705,7 @@ class GraphClient:
                 }
             }
         
-        logger.info(f"Updating page {page_id}")
+        logger.info("Updating page %s", page_id)
         return await self.patch(endpoint, data)
     
     async def publish_page(self, site_id: str, page_id: str) -> Dict[str, Any]:
@@ -567,7 +719,7 @@ class GraphClient:
             Published page information
         """
         endpoint = f"sites/{site_id}/pages/{page_id}/publish"
-        logger.info(f"Publishing page {page_id}")
+        logger.info("Publishing page %s", page_id)
         return await self.post(endpoint, {})
     
     async def get_document_content(self, site_id: str, drive_id: str, item_id: str) -> bytes:
@@ -586,16 +738,61 @@ class GraphClient:
         # Remove Content-Type header to respect response Content-Type
         headers.pop("Content-Type", None)
         
-        logger.info(f"Getting document content for item {item_id}")
-        response = requests.get(url, headers=headers, stream=True)
+        logger.info("Getting document content for item %s", item_id)
+        response = await self._send(self.session.get, url, headers=headers)
         
         if response.status_code != 200:
             error_text = response.text
-            logger.error(f"Graph API error: {response.status_code} - {error_text}")
+            logger.error("Graph API error: %s - %s", response.status_code, error_text)
             raise Exception(f"Graph API error: {response.status_code} - {error_text}")
         
         return response.content
     
+    async def open_document_stream(self, site_id: str, drive_id: str, item_id: str) -> requests.Response:
+        """Start downloading a document without reading its body.
+        
+        Args:
+            site_id: ID of the site
+            drive_id: ID of the document library
+            item_id: ID of the document
+        
+        Returns:
+            Streaming response to read with iter_content()
+        """
+        url = f"{self.base_url}/sites/{site_id}/drives/{drive_id}/items/{item_id}/content"
+        headers = self.context.headers.copy()
+        # Remove Content-Type header to respect response Content-Type
+        headers.pop("Content-Type", None)
+        
+        logger.info("Streaming document content for item %s", item_id)
+        response = await self._send(self.session.get, url, headers=headers, stream=True)
+        
+        if response.status_code != 200:
+            error_text = response.text
+            response.close()
+            logger.error("Graph API error: %s - %s", response.status_code, error_text)
+            raise Exception(f"Graph API error: {response.status_code} - {error_text}")
+        
+        return response
+    
+    @staticmethod
+    async def iter_content(response: requests.Response, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        """Yield the body of a streaming response in chunks, reading in a worker thread.
+        
+        Args:
+            response: Response returned by open_document_stream()
+            chunk_size: Maximum size of each chunk in bytes
+        """
+        chunks = response.iter_content(chunk_size=chunk_size)
+        try:
+            while True:
+                chunk = await anyio.to_thread.run_sync(next, chunks, None)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            response.close()
+    
     async def upload_document(self, site_id: str, drive_id: str, folder_path: str, 
                           file_name: str, file_content: bytes, 
                           content_type: str = None) -> Dict[str, Any]:
@@ -620,7 +817,7 @@ class GraphClient:
             # Upload to root folder
             endpoint = f"sites/{site_id}/drives/{drive_id}/root:/{file_name}:/content"
         
-        logger.info(f"Uploading document {file_name} to {folder_path if folder_path else 'root'}")
+        logger.info("Uploading document %s to %s", file_name, folder_path if folder_path else 'root')
         
         # For small files, use simple upload
         if len(file_content) < 4 * 1024 * 1024:  # 4 MB
@@ -665,7 +862,7 @@ class GraphClient:
             try:
                 # Check if folder exists
                 result = await self.get(endpoint)
-                logger.info(f"Folder '{current_path}' already exists")
+                logger.info("Folder '%s' already exists", current_path)
             except Exception:
                 # Folder doesn't exist, create it
                 endpoint = f"sites/{site_id}/drives/{drive_id}/root/children"
@@ -680,7 +877,7 @@ class GraphClient:
                     parent_path = "/".join(parts[:i])
                     endpoint = f"sites/{site_id}/drives/{drive_id}/root:/{parent_path}:/children"
                 
-                logger.info(f"Creating folder '{part}' in path '{current_path}'")
+                logger.info("Creating folder '%s' in path '%s'", part, current_path)
                 result = await self.post(endpoint, data)
         
         return result
@@ -707,7 +904,7 @@ class GraphClient:
             "description": f"AI-optimized list for {purpose}"
         }
         
-        logger.info(f"Creating intelligent list for purpose: {purpose}")
+        logger.info("Creating intelligent list for purpose: %s", purpose)
         list_info = await self.post(endpoint, data)
         list_id = list_info.get("id")
         
@@ -718,7 +915,7 @@ class GraphClient:
             try:
                 await self.add_column_to_list(site_id, list_id, column)
             except Exception as e:
-                logger.warning(f"Error adding column {column.get('name')}: {str(e)}")
+                logger.warning("Error adding column %s: %s", column.get('name'), e)
         
         return list_info
     
@@ -836,7 +1033,7 @@ class GraphClient:
             "description": f"Advanced document library for {doc_type} documents"
         }
         
-        logger.info(f"Creating advanced document library for {doc_type} documents")
+        logger.info("Creating advanced document library for %s documents", doc_type)
         library_info = await self.post(endpoint, data)
         list_id = library_info.get("id")
         drive_id = None
@@ -847,7 +1044,7 @@ class GraphClient:
             drive_info = await self.get(drives_endpoint)
             drive_id = drive_info.get("id")
         except Exception as e:
-            logger.warning(f"Could not get drive ID: {str(e)}")
+            logger.warning("Could not get drive ID: %s", e)
         
         # Add metadata columns based on document type
         columns = await self._get_document_metadata_schema(doc_type)
@@ -856,7 +1053,7 @@ class GraphClient:
             try:
                 await self.add_column_to_list(site_id, list_id, column)
             except Exception as e:
-                logger.warning(f"Error adding column {column.get('name')}: {str(e)}")
+                logger.warning("Error adding column %s: %s", column.get('name'), e)
         
         # Create folder structure if drive ID is available
         if drive_id:
@@ -866,7 +1063,7 @@ class GraphClient:
                 try:
                     await self.create_folder_in_library(site_id, drive_id, folder)
                 except Exception as e:
-                    logger.warning(f"Error creating folder {folder}: {str(e)}")
+                    logger.warning("Error creating folder %s: %s", folder, e)
         
         return library_info
     